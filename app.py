@@ -1,31 +1,321 @@
 import streamlit as st
-from openai import OpenAI
 import os
+import asyncio
 import shutil
-import PyPDF2
-import pandas as pd
 import json
-import numpy as np
 from zipfile import ZipFile
-import requests
 import bcrypt
-import base64
+import hashlib
+import tempfile
+import cProfile
+import io
+import pstats
+import re
+import statistics
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
 from styles_and_html import get_page_bg_and_logo_styles
-import os
-import pandas as pd
-from zipfile import ZipFile
-from sklearn.preprocessing import MinMaxScaler
-import streamlit as st
+
+# Heavy dependencies (openai, PyPDF2, pandas, numpy, scikit-learn) are imported inside the
+# functions that use them, so a worker only pays for them once that feature first runs
 
 api_key = st.secrets["general"]["OPENAI_API_KEY"]
 if not api_key:
     st.error("API key not found. Please set the OPENAI_API_KEY environment variable.")
     st.stop()
 
-client = OpenAI(api_key=api_key)
+# Steps that call GPT, named at each call site; deadlines, hedging and telemetry are kept per step
+GPT_STEP_NAMES = (
+    "buyer_persona", "buyer_persona_editor", "mission_statement", "mission_statement_editor",
+    "seo_summarizer", "seo_summarizer_editor", "magic_words", "brand_voice", "brand_voice_editor",
+    "topic_cluster", "topic_cluster_editor", "extract_keywords", "website_structure",
+    "extract_home_page", "home_page", "home_page_editor", "extract_about_us", "about_us", "about_us_editor",
+    "services_page", "services_page_editor", "pillar_page", "pillar_page_editor",
+)
+# Deadline for one GPT step in seconds, with per-step overrides keyed by the names above,
+# e.g. GPT_STEP_TIMEOUTS='{"home_page_editor": 90, "pillar_page": 240}'
+GPT_TIMEOUT_SECONDS = float(os.environ.get("GPT_TIMEOUT_SECONDS", "180"))
+GPT_STEP_TIMEOUTS = json.loads(os.environ.get("GPT_STEP_TIMEOUTS", "{}"))
+if set(GPT_STEP_TIMEOUTS) - set(GPT_STEP_NAMES):
+    raise ValueError(f"GPT_STEP_TIMEOUTS has unknown steps {sorted(set(GPT_STEP_TIMEOUTS) - set(GPT_STEP_NAMES))}, "
+                     f"the steps are {', '.join(GPT_STEP_NAMES)}")
+# Hedging sends a duplicate request once a call outlives the step's observed p95 latency
+GPT_HEDGING = os.environ.get("GPT_HEDGING", "").lower() in ("1", "true", "yes")
+GPT_HEDGE_MIN_SAMPLES = 20
+GPT_LATENCY_WINDOW = 200
+# Rate limits, server errors and dropped connections are retried with backoff while the deadline allows
+GPT_RETRY_BASE_SECONDS = 1
+GPT_RETRY_MAX_SECONDS = 30
+
+# Function to run one event loop for GPT requests in a background thread, shared by all sessions.
+# Requests are coroutines on it, so concurrent calls are not capped by a thread pool and a losing
+# hedge can really be cancelled.
+@st.cache_resource
+def get_gpt_loop():
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, name="gpt-loop", daemon=True).start()
+    return loop
+
+# Function to create the OpenAI client once per worker, on the first GPT task; it is only used on the
+# GPT event loop. The SDK's retries are off, create_chat_completion retries within the step's deadline.
+@st.cache_resource
+def get_openai_client():
+    from openai import AsyncOpenAI
+    return AsyncOpenAI(api_key=api_key, max_retries=0)
+
+# Function to share per-step latency samples and request counters across sessions
+@st.cache_resource
+def get_gpt_telemetry():
+    return {"lock": threading.Lock(), "latencies": {}, "counts": {}}
+
+# Function to add to one of a step's telemetry counters
+def count_gpt_event(telemetry, step, event, amount=1):
+    with telemetry['lock']:
+        counts = telemetry['counts'].setdefault(step, {"calls": 0, "requests": 0, "retries": 0, "hedged": 0, "hedge_wins": 0, "cancelled": 0, "timeouts": 0, "errors": 0})
+        counts[event] += amount
+
+# Function to add one attempt's latency to the step's recent samples
+def record_gpt_latency(telemetry, step, seconds):
+    with telemetry['lock']:
+        telemetry['latencies'].setdefault(step, deque(maxlen=GPT_LATENCY_WINDOW)).append(seconds)
+
+# Function to return the step's p95 latency once enough calls have been observed
+def gpt_hedge_delay(telemetry, step):
+    with telemetry['lock']:
+        samples = list(telemetry['latencies'].get(step, ()))
+    if len(samples) < GPT_HEDGE_MIN_SAMPLES:
+        return None
+    return statistics.quantiles(samples, n=20)[-1]
+
+# Function to return how long to wait before retrying a failed attempt, or None if it is not worth retrying
+def gpt_retry_delay(error, retries):
+    from openai import APIConnectionError, InternalServerError, RateLimitError
+
+    if not isinstance(error, (RateLimitError, APIConnectionError, InternalServerError)):
+        return None
+    response = getattr(error, "response", None)
+    try:
+        return float(response.headers["retry-after"])
+    except (AttributeError, KeyError, TypeError, ValueError):
+        return min(GPT_RETRY_BASE_SECONDS * 2 ** retries, GPT_RETRY_MAX_SECONDS)
+
+# Function to send one attempt with the given share of the step's deadline, recording how long it took
+async def send_gpt_attempt(client, telemetry, step, request, timeout):
+    from openai import APITimeoutError
+
+    sent = time.monotonic()
+    try:
+        response = await client.chat.completions.create(**request, timeout=timeout)
+    except (asyncio.CancelledError, APITimeoutError):
+        # A cancelled or timed out attempt still tells us the latency was at least this long
+        record_gpt_latency(telemetry, step, time.monotonic() - sent)
+        raise
+    record_gpt_latency(telemetry, step, time.monotonic() - sent)
+    return response
+
+# Function to get a chat completion within the step's deadline, hedging slow attempts and retrying
+# transient errors. Returns the response, or None and a message to show when the step failed.
+async def hedged_chat_completion(client, telemetry, step, request, deadline, hedge_delay):
+    started = time.monotonic()
+    ends = started + deadline
+
+    # Each attempt is sent with whatever is left of the deadline
+    def send():
+        count_gpt_event(telemetry, step, "requests")
+        return asyncio.ensure_future(send_gpt_attempt(client, telemetry, step, request, ends - time.monotonic()))
+
+    pending = {send()}
+    hedges = set()
+    hedge_at = started + hedge_delay if hedge_delay is not None and hedge_delay < deadline else None
+    retry_at = None
+    retries = 0
+    error = None
+    try:
+        while time.monotonic() < ends:
+            wake_at = min(moment for moment in (hedge_at, retry_at, ends) if moment is not None)
+            if pending:
+                done, pending = await asyncio.wait(pending, timeout=max(wake_at - time.monotonic(), 0), return_when=asyncio.FIRST_COMPLETED)
+            else:
+                await asyncio.sleep(max(wake_at - time.monotonic(), 0))
+                done = set()
+
+            # Take whichever attempt succeeds first; a failed attempt leaves the other one running
+            for attempt in done:
+                if attempt.exception() is None:
+                    if attempt in hedges:
+                        count_gpt_event(telemetry, step, "hedge_wins")
+                    return attempt.result(), None
+                error = attempt.exception()
+                count_gpt_event(telemetry, step, "errors")
+                delay = gpt_retry_delay(error, retries)
+                if delay is not None and not pending and retry_at is None and time.monotonic() + delay < ends:
+                    retry_at = time.monotonic() + delay
+
+            now = time.monotonic()
+            if hedge_at is not None and now >= hedge_at:
+                hedge_at = None
+                if pending:
+                    hedge = send()
+                    hedges.add(hedge)
+                    pending.add(hedge)
+                    count_gpt_event(telemetry, step, "hedged")
+            if retry_at is not None and now >= retry_at:
+                retry_at = None
+                retries += 1
+                pending.add(send())
+                count_gpt_event(telemetry, step, "retries")
+            if not pending and retry_at is None:
+                return None, f"The {step} step failed: {error}. Please try again."
+
+        count_gpt_event(telemetry, step, "timeouts")
+        return None, f"The {step} step did not finish within {deadline:g} seconds. Please try again."
+    finally:
+        # Losing and overdue attempts are cancelled, which aborts their requests
+        cancelled = [attempt for attempt in pending if attempt.cancel()]
+        if cancelled:
+            await asyncio.wait(cancelled)
+            count_gpt_event(telemetry, step, "cancelled", len(cancelled))
+
+# Function to send a chat completion within the step's deadline, stopping the step if it fails
+def create_chat_completion(step, **request):
+    deadline = GPT_STEP_TIMEOUTS.get(step, GPT_TIMEOUT_SECONDS)
+    telemetry = get_gpt_telemetry()
+    count_gpt_event(telemetry, step, "calls")
+    hedge_delay = gpt_hedge_delay(telemetry, step) if GPT_HEDGING else None
+
+    completion = hedged_chat_completion(get_openai_client(), telemetry, step, request, deadline, hedge_delay)
+    response, failure = asyncio.run_coroutine_threadsafe(completion, get_gpt_loop()).result()
+    if failure is not None:
+        st.error(failure)
+        st.stop()
+    return response
+
+# Profiling is opt-in through PROFILE_APP=1 or, for logged in users, ?profile=1; reports are written to PROFILE_DIR
+PROFILE_DIR = os.environ.get("PROFILE_DIR", "profiles")
+PROFILE_TOP_N = 15
+# Only the newest report files are kept
+PROFILE_MAX_FILES = int(os.environ.get("PROFILE_MAX_FILES", "500"))
+
+# Function to check whether profiling was requested through the environment or the URL
+def profiling_enabled():
+    if os.environ.get("PROFILE_APP", "").lower() in ("1", "true", "yes"):
+        return True
+    if not st.session_state.get('logged_in'):
+        return False
+    return st.experimental_get_query_params().get("profile", [""])[0].lower() in ("1", "true", "yes")
+
+# Function to remove the oldest profiling reports beyond PROFILE_MAX_FILES
+def prune_profile_reports():
+    reports = sorted((entry for entry in os.scandir(PROFILE_DIR) if entry.is_file()), key=lambda entry: entry.stat().st_mtime)
+    for entry in reports[:max(len(reports) - PROFILE_MAX_FILES, 0)]:
+        try:
+            os.remove(entry.path)
+        except FileNotFoundError:
+            pass
+
+# cProfile hooks the whole interpreter on Python 3.12+, so only one session profiles a rerun at a time
+PROFILER_LOCK = threading.Lock()
+
+# Function to time a named step of a profiled rerun
+@contextmanager
+def profile_step(name):
+    run = st.session_state.get('profile_run')
+    if run is None:
+        yield
+        return
+
+    run['depth'] += 1
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        run['depth'] -= 1
+        run['steps'].append({"step": name, "depth": run['depth'], "seconds": round(elapsed, 4)})
+
+# Function to dump a rerun's profile and keep its top hot spots for the summary panel
+def write_profile_report(run, name, profiler):
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    report_path = os.path.join(PROFILE_DIR, f"{run['id']}_{re.sub(r'[^A-Za-z0-9_-]+', '_', name)}")
+    profiler.dump_stats(report_path + ".prof")
+
+    stream = io.StringIO()
+    stats = pstats.Stats(profiler, stream=stream)
+    stats.sort_stats("cumulative").print_stats(PROFILE_TOP_N)
+    with open(report_path + ".txt", "w") as f:
+        f.write(stream.getvalue())
+
+    hot_spots = sorted(stats.stats.items(), key=lambda item: item[1][2], reverse=True)[:PROFILE_TOP_N]
+    run['hot_spots'][name] = [
+        {"function": f"{os.path.basename(file)}:{line}({func})", "calls": calls, "own seconds": round(own, 4), "total seconds": round(total, 4)}
+        for (file, line, func), (_, calls, own, total, _) in hot_spots
+    ]
+
+# Function to start cProfile for a rerun, or return None when another session is already profiling
+def start_profiler():
+    if not PROFILER_LOCK.acquire(blocking=False):
+        return None
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:
+        # Another profiler or debugger holds the interpreter's monitoring hooks
+        PROFILER_LOCK.release()
+        return None
+    return profiler
+
+# Function to profile one rerun of the script, login or main included, and show where its time went
+@contextmanager
+def profile_rerun():
+    if not profiling_enabled():
+        yield
+        return
+
+    run = {"id": time.strftime("%Y%m%d-%H%M%S") + f"-{int(time.time() * 1000) % 1000:03d}",
+           "depth": 0, "steps": [], "hot_spots": {}}
+    st.session_state['profile_run'] = run
+    profiler = start_profiler()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        if profiler is not None:
+            profiler.disable()
+            PROFILER_LOCK.release()
+            write_profile_report(run, "rerun", profiler)
+        st.session_state['profile_run'] = None
+        run['steps'].append({"step": "rerun", "depth": 0, "seconds": round(elapsed, 4)})
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        with open(os.path.join(PROFILE_DIR, f"{run['id']}_summary.json"), "w") as f:
+            json.dump({"steps": run['steps'], "hot_spots": run['hot_spots']}, f, indent=2)
+        prune_profile_reports()
+        show_profile_summary(run)
+
+# Function to render the profiling summary panel in the sidebar
+def show_profile_summary(run):
+    import pandas as pd
+
+    with st.sidebar.expander("Profiling", expanded=True):
+        st.caption(f"Reports for this rerun are saved under the id {run['id']}.")
+        if not run['hot_spots']:
+            st.caption("Another session or tool was already profiling, so only step timings were recorded for this rerun.")
+        st.table(pd.DataFrame(run['steps']).sort_values(by="seconds", ascending=False))
+        for name, hot_spots in run['hot_spots'].items():
+            st.markdown(f"**{name}**")
+            st.table(pd.DataFrame(hot_spots).head(5))
+        gpt_counts = get_gpt_telemetry()['counts']
+        if gpt_counts:
+            st.markdown("**GPT requests**")
+            st.table(pd.DataFrame(gpt_counts).T)
 
 # Function to read PDF content
+@profile_step("read_pdf")
 def read_pdf(file_path):
+    import PyPDF2
+
     content = ""
     with open(file_path, "rb") as f:
         reader = PyPDF2.PdfReader(f)
@@ -34,8 +324,10 @@ def read_pdf(file_path):
     return content
 
 # Function to run a GPT task
-def run_gpt_task(instructions, prompt):
-    response = client.chat.completions.create(
+@profile_step("run_gpt_task")
+def run_gpt_task(step, instructions, prompt):
+    response = create_chat_completion(
+        step,
         model="gpt-4o",
         messages=[
             {"role": "system", "content": instructions},
@@ -45,6 +337,398 @@ def run_gpt_task(instructions, prompt):
     )
     return response.choices[0].message.content
 
+# Function to run a GPT task whose answer must be JSON matching one of the schemas
+@profile_step("run_gpt_json_task")
+def run_gpt_json_task(step, instructions, prompt, schema_name, max_tokens=1000):
+    response = create_chat_completion(
+        step,
+        model="gpt-4o",
+        messages=[
+            {"role": "system", "content": instructions},
+            {"role": "user", "content": prompt}
+        ],
+        response_format={
+            "type": "json_schema",
+            "json_schema": {"name": schema_name, "strict": True, "schema": schemas[schema_name]}
+        },
+        max_tokens=max_tokens
+    )
+
+    # A refused or truncated answer is not valid JSON, stop the step instead of failing halfway through parsing
+    choice = response.choices[0]
+    if getattr(choice.message, "refusal", None):
+        st.error(f"The model declined to return the {schema_name} data: {choice.message.refusal}")
+        st.stop()
+    if choice.finish_reason == "length" or not choice.message.content:
+        st.error(f"The {schema_name} data was cut off before it was complete. Please try again.")
+        st.stop()
+    return json.loads(choice.message.content)
+
+# Function to render a JSON artifact as compactly as possible for use inside another prompt
+def compact_json(data):
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+
+# Keywords whose character n-gram cosine similarity reaches this value are treated as near-duplicates
+KEYWORD_SIMILARITY_THRESHOLD = 0.85
+# Undecided rows resolved per round; a chunk is matched against itself, so this bounds the
+# pairs checked when a whole chunk is one cluster of near-duplicates
+KEYWORD_DEDUP_CHUNK_SIZE = 1024
+# Candidate pairs verified per batch, bounds the memory of the row-wise n-gram overlap
+KEYWORD_DEDUP_PAIR_BATCH = 250000
+
+# Function to collapse near-duplicate keywords, keeping the best-scoring representative
+@profile_step("dedupe_keywords")
+def dedupe_keywords(data, threshold=KEYWORD_SIMILARITY_THRESHOLD, chunk_size=KEYWORD_DEDUP_CHUNK_SIZE):
+    if len(data) < 2:
+        return data
+
+    import numpy as np
+    from sklearn.feature_extraction.text import HashingVectorizer
+
+    # Order candidates so the highest score always wins its group
+    data = data.sort_values(by='Score', ascending=False, kind='mergesort')
+    keywords = data['Keyword'].astype(str).str.lower().str.strip()
+
+    # Build a sparse binary character n-gram index over every candidate keyword
+    vectorizer = HashingVectorizer(analyzer='char_wb', ngram_range=(3, 4), n_features=2 ** 20,
+                                   alternate_sign=False, binary=True, norm=None)
+    index = vectorizer.transform(keywords).tocsr()
+    index.sum_duplicates()
+    index.sort_indices()
+    sizes = np.diff(index.indptr)
+    rows = np.repeat(np.arange(index.shape[0]), sizes)
+
+    # Prefix filtering: two keywords with cosine >= threshold must share one of the
+    # len - ceil(threshold^2 * len) + 1 rarest n-grams of each, so only those are matched
+    frequency = np.bincount(index.indices, minlength=index.shape[1])
+    order = np.lexsort((frequency[index.indices], rows))
+    rank = np.arange(len(order)) - index.indptr[rows]
+    prefix_sizes = sizes - np.ceil(threshold ** 2 * sizes).astype(int) + 1
+    in_prefix = np.zeros(len(order), dtype=bool)
+    in_prefix[order] = rank < prefix_sizes[rows]
+    prefix = index.copy()
+    prefix.data = in_prefix.astype(prefix.data.dtype)
+    prefix.eliminate_zeros()
+
+    # Function to find the pairs between two sets of rows whose exact cosine similarity reaches the threshold
+    def similar_pairs(left_rows, right_rows):
+        candidates = (prefix[left_rows] @ prefix[right_rows].T).tocoo()
+        left = left_rows[candidates.row]
+        right = right_rows[candidates.col]
+        # Keywords whose n-gram counts differ too much can never reach the threshold
+        plausible = (threshold ** 2 * sizes[left] <= sizes[right]) & (threshold ** 2 * sizes[right] <= sizes[left])
+        left, right = left[plausible], right[plausible]
+        similar = np.zeros(len(left), dtype=bool)
+        for batch in range(0, len(left), KEYWORD_DEDUP_PAIR_BATCH):
+            batch_left = left[batch:batch + KEYWORD_DEDUP_PAIR_BATCH]
+            batch_right = right[batch:batch + KEYWORD_DEDUP_PAIR_BATCH]
+            overlap = np.asarray(index[batch_left].multiply(index[batch_right]).sum(axis=1)).ravel()
+            similar[batch:batch + KEYWORD_DEDUP_PAIR_BATCH] = overlap >= threshold * np.sqrt(sizes[batch_left] * sizes[batch_right])
+        return left[similar], right[similar]
+
+    # Walk rows best-first, a chunk of still undecided rows at a time. Each chunk is first resolved
+    # against itself, then only its kept rows are matched against the later undecided rows, so
+    # suppressed rows never take part in a product and the work is bounded by kept rows times rows
+    dropped = np.zeros(index.shape[0], dtype=bool)
+    keep = np.zeros(index.shape[0], dtype=bool)
+    position = 0
+    while position < index.shape[0]:
+        undecided = np.flatnonzero(~dropped[position:]) + position
+        if not len(undecided):
+            break
+        chunk, rest = undecided[:chunk_size], undecided[chunk_size:]
+
+        left, right = similar_pairs(chunk, chunk)
+        later = left < right
+        left, right = left[later], right[later]
+        by_left = np.argsort(left, kind='stable')
+        left, right = left[by_left], right[by_left]
+        bounds = np.searchsorted(left, np.append(chunk, chunk[-1] + 1))
+        for offset, row in enumerate(chunk):
+            if dropped[row]:
+                continue
+            keep[row] = True
+            dropped[right[bounds[offset]:bounds[offset + 1]]] = True
+
+        kept_rows = chunk[keep[chunk]]
+        if len(rest) and len(kept_rows):
+            _, suppressed = similar_pairs(kept_rows, rest)
+            dropped[suppressed] = True
+        position = chunk[-1] + 1
+
+    return data[keep]
+
+# Only these columns of a Keyword Planner export are needed, read as text and converted explicitly
+KEYWORD_EXPORT_COLUMNS = ['Keyword', 'Avg. monthly searches', 'Competition (indexed value)', 'Top of page bid (high range)']
+KEYWORD_METRIC_COLUMNS = KEYWORD_EXPORT_COLUMNS[1:]
+# Exports larger than this are processed in chunks with bounded memory
+STREAMING_CSV_BYTES = int(os.environ.get("STREAMING_CSV_MB", "50")) * 1024 * 1024
+STREAMING_CHUNK_ROWS = 100000
+# Scored rows deduplicated per round; memory depends on this rather than on the export size
+KEYWORD_WINDOW_ROWS = 10000
+# Streamed windows double after each full re-read up to this size, so an export whose top rows are
+# mostly near-duplicates needs few passes
+KEYWORD_MAX_WINDOW_ROWS = 80000
+# Full re-reads of a streamed export stop after this many windows, keeping the keywords found so far
+STREAMING_MAX_PASSES = 10
+TOP_KEYWORDS_PER_FILE = 150
+
+# Function to read a Keyword Planner export, whole or as an iterator of chunks
+def read_keyword_export(file_path, chunksize=None):
+    import pandas as pd
+
+    return pd.read_csv(file_path, encoding='utf-16', delimiter='\t', skiprows=2,
+                       usecols=KEYWORD_EXPORT_COLUMNS, dtype=str, chunksize=chunksize)
+
+# Function to convert the metrics to numbers and drop keywords not worth pursuing
+def filter_keyword_data(data):
+    import pandas as pd
+
+    # Define fixed thresholds
+    competition_threshold = 80
+    search_volume_threshold = 50
+    bid_threshold = 2
+
+    # Convert columns to numeric types and handle missing values
+    data['Avg. monthly searches'] = pd.to_numeric(data['Avg. monthly searches'], errors='coerce').fillna(0)
+    data['Competition (indexed value)'] = pd.to_numeric(data['Competition (indexed value)'], errors='coerce').fillna(100)
+    data['Top of page bid (high range)'] = pd.to_numeric(data['Top of page bid (high range)'], errors='coerce').fillna(0)
+
+    # Filter out highly competitive keywords and those not worth pursuing
+    return data[(data['Competition (indexed value)'] <= competition_threshold) &
+                (data['Avg. monthly searches'] >= search_volume_threshold) &
+                (data['Top of page bid (high range)'] >= bid_threshold)].copy()
+
+# Function to normalise the metrics with a fitted Min-Max scaler and compute the combined score
+def score_keyword_data(data, scaler):
+    data[KEYWORD_METRIC_COLUMNS] = scaler.transform(data[KEYWORD_METRIC_COLUMNS])
+
+    # Define weights for each factor (adjust as needed)
+    weights = {
+        'Avg. monthly searches': 0.3,
+        'Competition (indexed value)': 0.4,
+        'Top of page bid (high range)': 0.3
+    }
+
+    # Calculate the combined score using the scaled values
+    data['Score'] = (
+        data['Avg. monthly searches'] * weights['Avg. monthly searches'] +
+        data['Competition (indexed value)'] * weights['Competition (indexed value)'] +
+        data['Top of page bid (high range)'] * weights['Top of page bid (high range)']
+    )
+    return data
+
+# Function to continue best-first deduplication with the next window of lower-scoring rows.
+# A row is only ever dropped for resembling a kept, higher-scoring row, so the rows kept so far
+# are all that is needed from earlier windows.
+def extend_kept_keywords(kept, window):
+    import pandas as pd
+
+    if kept is None:
+        return dedupe_keywords(window)
+    return dedupe_keywords(pd.concat([kept, window]))
+
+# Function to pick the top keywords of one Keyword Planner export
+@profile_step("process_google_data")
+def process_google_data(file_path, company_name):
+    from sklearn.preprocessing import MinMaxScaler
+
+    if os.path.getsize(file_path) > STREAMING_CSV_BYTES:
+        return process_google_data_streaming(file_path)
+
+    data = filter_keyword_data(read_keyword_export(file_path))
+    if data.empty:
+        return data.assign(Score=0.0)
+
+    # Normalize each feature using Min-Max scaling
+    scaler = MinMaxScaler().fit(data[KEYWORD_METRIC_COLUMNS])
+    data = score_keyword_data(data, scaler)
+
+    # Sort by the combined score and collapse near-duplicate variants window by window
+    # until enough keywords are kept
+    data = data.sort_values(by='Score', ascending=False, kind='mergesort')
+    kept = None
+    for start in range(0, len(data), KEYWORD_WINDOW_ROWS):
+        kept = extend_kept_keywords(kept, data.iloc[start:start + KEYWORD_WINDOW_ROWS])
+        if len(kept) >= TOP_KEYWORDS_PER_FILE:
+            break
+    return kept.head(TOP_KEYWORDS_PER_FILE)
+
+# Function to pick the same top keywords as process_google_data with memory bounded by the chunk and window sizes
+@profile_step("process_google_data_streaming")
+def process_google_data_streaming(file_path, chunk_rows=STREAMING_CHUNK_ROWS, window_rows=KEYWORD_WINDOW_ROWS):
+    import pandas as pd
+    from sklearn.preprocessing import MinMaxScaler
+
+    # First pass: the Min-Max statistics of the filtered rows
+    scaler = MinMaxScaler()
+    filtered_rows = 0
+    for chunk in read_keyword_export(file_path, chunksize=chunk_rows):
+        chunk = filter_keyword_data(chunk)
+        if len(chunk):
+            scaler.partial_fit(chunk[KEYWORD_METRIC_COLUMNS])
+            filtered_rows += len(chunk)
+    if not filtered_rows:
+        return pd.DataFrame(columns=KEYWORD_EXPORT_COLUMNS + ['Score'])
+
+    # Further passes: each collects the next window of rows by score, ties in file order like the
+    # stable sort in the in-memory path, and deduplicates it against the keywords kept so far
+    kept = None
+    boundary = None
+    for _ in range(STREAMING_MAX_PASSES):
+        window = None
+        for chunk in read_keyword_export(file_path, chunksize=chunk_rows):
+            chunk = filter_keyword_data(chunk)
+            if not len(chunk):
+                continue
+            chunk = score_keyword_data(chunk, scaler)
+            if boundary is not None:
+                boundary_score, boundary_row = boundary
+                chunk = chunk[(chunk['Score'] < boundary_score) |
+                              ((chunk['Score'] == boundary_score) & (chunk.index > boundary_row))]
+            chunk = chunk.sort_values(by='Score', ascending=False, kind='mergesort').head(window_rows)
+            if window is not None:
+                chunk = pd.concat([window, chunk]).sort_values(by='Score', ascending=False, kind='mergesort')
+            window = chunk.head(window_rows)
+
+        if window is None or window.empty:
+            break
+        kept = extend_kept_keywords(kept, window)
+        if len(kept) >= TOP_KEYWORDS_PER_FILE or len(window) < window_rows:
+            break
+        boundary = (window['Score'].iloc[-1], window.index[-1])
+        window_rows = max(min(window_rows * 2, KEYWORD_MAX_WINDOW_ROWS), window_rows)
+    else:
+        st.warning(f"Only {len(kept)} distinct keywords were found in the first {STREAMING_MAX_PASSES} passes over {os.path.basename(file_path)}.")
+
+    return kept.head(TOP_KEYWORDS_PER_FILE)
+
+# Uploads are streamed to disk in chunks of this size instead of being buffered whole
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+# Size caps, configurable through the environment
+MAX_UPLOAD_BYTES = int(os.environ.get("MAX_UPLOAD_MB", "200")) * 1024 * 1024
+MAX_SESSION_UPLOAD_BYTES = int(os.environ.get("MAX_SESSION_UPLOAD_MB", "1000")) * 1024 * 1024
+# Content-addressed store shared by all sessions, one file per distinct upload
+UPLOAD_STORE = os.path.join("uploads", "store")
+# Stored files no longer linked from uploads/ are removed once they are this old
+UPLOAD_STORE_MAX_AGE_SECONDS = float(os.environ.get("UPLOAD_STORE_MAX_AGE_HOURS", "24")) * 3600
+
+# Function to remove stored uploads that nothing links to any more
+def prune_upload_store():
+    cutoff = time.time() - UPLOAD_STORE_MAX_AGE_SECONDS
+    for entry in os.scandir(UPLOAD_STORE):
+        try:
+            stat = entry.stat()
+            if entry.is_file() and stat.st_nlink == 1 and stat.st_mtime < cutoff:
+                os.remove(entry.path)
+        except FileNotFoundError:
+            pass
+
+# Function to return the id Streamlit keeps an uploaded file under across reruns
+def upload_key(uploaded_file):
+    return getattr(uploaded_file, "file_id", None) or getattr(uploaded_file, "id", None) or (uploaded_file.name, uploaded_file.size)
+
+# Function to record the uploads a file uploader currently holds. Streamlit keeps them in memory
+# until the uploader is cleared, so an empty uploader releases its entry.
+def track_uploader(widget_key, value):
+    if 'held_uploads' not in st.session_state:
+        st.session_state['held_uploads'] = {}
+    if not value:
+        st.session_state['held_uploads'].pop(widget_key, None)
+        return
+    uploaded_files = value if isinstance(value, list) else [value]
+    st.session_state['held_uploads'][widget_key] = {upload_key(uploaded_file): uploaded_file.size for uploaded_file in uploaded_files}
+
+# Function to add up the bytes of accepted uploads the session's uploaders still hold, each upload counted once
+def held_upload_bytes(exclude=None):
+    accepted = st.session_state.get('spooled_uploads', {})
+    held = {}
+    for uploads in st.session_state.get('held_uploads', {}).values():
+        held.update((key, size) for key, size in uploads.items() if key in accepted)
+    held.pop(exclude, None)
+    return sum(held.values())
+
+# Function to stream an uploaded file into the store once and return the stored path.
+# The session cap applies to the uploads its uploaders currently hold, see track_uploader.
+@profile_step("spool_upload")
+def spool_upload(uploaded_file):
+    if 'spooled_uploads' not in st.session_state:
+        st.session_state['spooled_uploads'] = {}
+
+    # Reruns hand back the same upload, so only spool it the first time it is seen
+    upload_id = upload_key(uploaded_file)
+    stored_path = st.session_state['spooled_uploads'].get(upload_id)
+    if stored_path is not None and os.path.exists(stored_path):
+        return stored_path
+
+    if uploaded_file.size > MAX_UPLOAD_BYTES:
+        st.error(f"File {uploaded_file.name} is larger than the {MAX_UPLOAD_BYTES // (1024 * 1024)} MB upload limit.")
+        return None
+    if held_upload_bytes(exclude=upload_id) + uploaded_file.size > MAX_SESSION_UPLOAD_BYTES:
+        st.error(f"File {uploaded_file.name} would exceed the {MAX_SESSION_UPLOAD_BYTES // (1024 * 1024)} MB session upload limit.")
+        return None
+
+    os.makedirs(UPLOAD_STORE, exist_ok=True)
+    digest = hashlib.sha256()
+    uploaded_file.seek(0)
+    with tempfile.NamedTemporaryFile(dir=UPLOAD_STORE, delete=False) as f:
+        try:
+            for chunk in iter(lambda: uploaded_file.read(UPLOAD_CHUNK_SIZE), b""):
+                digest.update(chunk)
+                f.write(chunk)
+        except BaseException:
+            f.close()
+            os.remove(f.name)
+            raise
+    uploaded_file.seek(0)
+
+    # Identical content is only kept once on disk
+    stored_path = os.path.join(UPLOAD_STORE, digest.hexdigest() + os.path.splitext(uploaded_file.name)[1].lower())
+    if os.path.exists(stored_path):
+        os.remove(f.name)
+        os.utime(stored_path)
+    else:
+        os.replace(f.name, stored_path)
+    prune_upload_store()
+
+    st.session_state['spooled_uploads'][upload_id] = stored_path
+    return stored_path
+
+# Function to place a stored upload at the path the later steps read from
+def link_upload(stored_path, destination):
+    if os.path.exists(destination):
+        if os.path.samefile(stored_path, destination):
+            return destination
+        os.remove(destination)
+    try:
+        os.link(stored_path, destination)
+    except OSError:
+        shutil.copyfile(stored_path, destination)
+    return destination
+
+# Function to spool an uploaded file and place it at the given path
+def save_upload(uploaded_file, destination):
+    stored_path = spool_upload(uploaded_file)
+    if stored_path is None:
+        return None
+    return link_upload(stored_path, destination)
+
+# Function to rebuild a download zip only when the files it should contain changed since it was written
+def refresh_zip(zip_path, members):
+    members = [(file_path, arcname) for file_path, arcname in members if os.path.exists(file_path)]
+    if os.path.exists(zip_path):
+        zip_mtime = os.stat(zip_path).st_mtime_ns
+        with ZipFile(zip_path) as zipf:
+            up_to_date = zipf.namelist() == [arcname for _, arcname in members]
+        # Linking a stored upload into place keeps the old mtime, but ctime changes with every write or new link
+        if up_to_date and all(os.stat(file_path).st_ctime_ns < zip_mtime for file_path, _ in members):
+            return zip_path
+
+    with ZipFile(zip_path, "w") as zipf:
+        for file_path, arcname in members:
+            zipf.write(file_path, arcname)
+    return zip_path
+
 # Load instructions from JSON file
 with open('instructions.json', 'r') as f:
     instructions = json.load(f)
@@ -53,6 +737,10 @@ with open('instructions.json', 'r') as f:
 with open('prompts.json', 'r') as f:
     prompts = json.load(f)
 
+# Load the output schemas for the extraction steps from JSON file
+with open('schemas.json', 'r') as f:
+    schemas = json.load(f)
+
 # Create a folder to save uploaded files if it doesn't exist
 if not os.path.exists("uploads"):
     os.makedirs("uploads")
@@ -66,6 +754,15 @@ output_folder = os.path.join("processed", "output_files")
 if not os.path.exists(output_folder):
     os.makedirs(output_folder)
 
+# Workshop documents every company needs to upload in the first step
+required_files = [
+    "product_list.pdf",
+    "USP.pdf",
+    "key_stats.pdf",
+    "about_us.pdf",
+    "colour_scheme.pdf"
+]
+
 if 'user_data' not in st.session_state:
     st.session_state['user_data'] = {'usernames': [], 'passwords': []}
 
@@ -78,32 +775,29 @@ def add_user():
         st.session_state['user_data']['usernames'].append(username)
         st.session_state['user_data']['passwords'].append(hashed_password)
 
-# Get the styles and HTML for the background and logo
-page_bg_img, logo_html = get_page_bg_and_logo_styles()
+# Function to apply the page background, logo and widget styles
+@profile_step("page_styles")
+def apply_page_styles():
+    # Get the styles and HTML for the background and logo
+    page_bg_img, logo_html = get_page_bg_and_logo_styles()
 
-# Apply CSS and HTML
-st.markdown(page_bg_img, unsafe_allow_html=True)
-st.markdown(logo_html, unsafe_allow_html=True)
+    # Apply CSS and HTML
+    st.markdown(page_bg_img, unsafe_allow_html=True)
+    st.markdown(logo_html, unsafe_allow_html=True)
 
-st.markdown("""
+    st.markdown("""
 <style>
-    .stTabs [data-baseweb="tab-list"] {
+    .stRadio [role="radiogroup"] {
         gap: 6px;
     }
-    .stTabs [data-baseweb="tab"] {
-        height: 40px;
+    .stRadio [role="radiogroup"] > label {
         white-space: pre-wrap;
         background-color: white;
         border-radius: 10px;
         border: 1px solid white;
-        gap: 6px;
-        padding-top: 15px;
-        padding-bottom: 15px;
-        color: black !important; /* Ensures the tab text is black */
-    }
-    .stTabs [aria-selected="true"] {
-        background-color: white;
-        color: black !important; /* Ensures the selected tab text is black */
+        padding: 10px 15px;
+        margin-right: 0;
+        color: black !important; /* Ensures the step text is black */
     }
     .stMarkdown p, .stHeader, .stTitle, .stSubheader, .stCaption, .stText, .stExpander, .stException {
         color: white !important; /* General text elements in Streamlit */
@@ -138,86 +832,62 @@ st.markdown("""
     .css-1g6gooi {
         display: none;
     }
-    /* Ensure the tab button text is styled consistently */
-    .stTabs [data-baseweb="tab"] > div > div, .stTabs [data-baseweb="tab"] > div {
-        color: black !important; /* Ensures the tab text is black */
+    /* Ensure the step button text is styled consistently */
+    .stRadio [role="radiogroup"] > label p {
+        color: black !important; /* Ensures the step text is black */
         font-weight: bold !important;
+        padding: 0;
     }
 </style>
 """, unsafe_allow_html=True)
 
-def main():
-    
-    st.markdown("<h1 style='color:white;'>Build The Brand</h1>", unsafe_allow_html=True)
-    # Tabs: Upload documents and specify company name, Run GPT Tasks, Upload CSV Files, Download Specific Outputs, Upload Pillar Page
-    tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs([
-        "Upload Required Documents", 
-        "Prep Docs", 
-        "Process and Analyze CSV Files", 
-        "Generate Website Content", 
-        "Create Pillar Page", 
-        "Download & Overwrite Files"
-    ])
-
-        # Initialize session state for company_name and uploaded_files
-    if 'company_name' not in st.session_state:
-        st.session_state.company_name = ''
-    
-    if 'uploaded_files' not in st.session_state:
-        st.session_state.uploaded_files = {}
-    
-    with tab1:
-        st.markdown("<h1 style='color:white;'>Step 1: Upload Files</h1>", unsafe_allow_html=True)
-        st.markdown("""
-            <p>In this step, you need to upload the workshop documents for analysis.</p>
-            <p>The system will save the uploaded documents for further processing in the subsequent steps as inputs for the model.</p>
-        """, unsafe_allow_html=True)
-        
-        # Use session state for company name input
-        company_name = st.text_input("Specify the company name", st.session_state.company_name)
-        st.session_state.company_name = company_name
-    
-        required_files = [
-            "product_list.pdf",
-            "USP.pdf",
-            "key_stats.pdf",
-            "about_us.pdf",
-            "colour_scheme.pdf"
-        ]
-    
-        uploaded_files = {}
-        for file in required_files:
-            uploaded_files[file] = st.file_uploader(f"Upload {file}", type="pdf", key=file)
-        
-        # Update session state with uploaded files
-        st.session_state.uploaded_files.update(uploaded_files)
-        
-        if st.button("Upload Documents"):
-            all_files_uploaded = True  
-            if company_name:
-                for file_name, uploaded_file in st.session_state.uploaded_files.items():
-                    if uploaded_file is not None:
-                        with open(os.path.join("uploads", f"{company_name}_{file_name}"), "wb") as f:
-                            f.write(uploaded_file.getbuffer())
-                    else:
-                        all_files_uploaded = False
-                        st.error(f"File {file_name} not found. Please upload it.")
-    
-                if all_files_uploaded:
-                    st.success("Files uploaded successfully!")
+# Function to render the step to upload the required documents
+@profile_step("upload_documents")
+def upload_documents_step():
+    st.markdown("<h1 style='color:white;'>Step 1: Upload Files</h1>", unsafe_allow_html=True)
+    st.markdown("""
+        <p>In this step, you need to upload the workshop documents for analysis.</p>
+        <p>The system will save the uploaded documents for further processing in the subsequent steps as inputs for the model.</p>
+    """, unsafe_allow_html=True)
+
+    # Use session state for company name input
+    company_name = st.text_input("Specify the company name", st.session_state.company_name)
+    st.session_state.company_name = company_name
+
+    # File uploaders are emptied when another step is shown, the stored paths in session state are kept
+    for file in required_files:
+        uploaded_file = st.file_uploader(f"Upload {file}", type="pdf", key=file)
+        track_uploader(file, uploaded_file)
+        if uploaded_file is not None:
+            stored_path = spool_upload(uploaded_file)
+            if stored_path is not None:
+                st.session_state.uploaded_files[file] = stored_path
+        elif st.session_state.uploaded_files.get(file) and os.path.exists(st.session_state.uploaded_files[file]):
+            st.caption(f"{file} is already uploaded for this session.")
+
+    if st.button("Upload Documents"):
+        all_files_uploaded = True  
+        if company_name:
+            for file_name in required_files:
+                stored_path = st.session_state.uploaded_files.get(file_name)
+                if stored_path is not None and os.path.exists(stored_path):
+                    link_upload(stored_path, os.path.join("uploads", f"{company_name}_{file_name}"))
                 else:
-                    st.error("Please upload all required documents.")
+                    all_files_uploaded = False
+                    st.error(f"File {file_name} not found. Please upload it.")
+
+            if all_files_uploaded:
+                st.success("Files uploaded successfully!")
             else:
-                st.error("Please specify the company name.")
-    
-        # Add download button for this tab's files
+                st.error("Please upload all required documents.")
+        else:
+            st.error("Please specify the company name.")
+
+    # Add download button for this tab's files
+    with profile_step("zip_uploads"):
         if os.path.exists("uploads"):
             zip_path = os.path.join("processed", f"{company_name}_uploads.zip")
-            with ZipFile(zip_path, "w") as zipf:
-                for file_name in required_files:
-                    file_path = os.path.join("uploads", f"{company_name}_{file_name}")
-                    if os.path.exists(file_path):
-                        zipf.write(file_path, file_name)
+            refresh_zip(zip_path, [(os.path.join("uploads", f"{company_name}_{file_name}"), file_name) for file_name in required_files])
             with open(zip_path, "rb") as zipf:
                 st.download_button(
                     label="Download Uploaded Documents",
@@ -225,110 +895,111 @@ def main():
                     file_name=f"{company_name}_uploads.zip"
                 )
 
-                        
-    with tab2:
-        st.markdown("<h1 style='color:white;'>Step 2: Build the Prep Docs</h1>", unsafe_allow_html=True)
-        st.markdown("""
-            <p style='color:black;'>In this step, you will run GPT tasks to process the uploaded documents. </p>
-            <p style='color:black;'>Outcome: The system will then generate outputs such as buyer persona, mission statement, brand voice, SEO summaries, and keywords for further research.</p>
-        """, unsafe_allow_html=True)
-
-        company_name = st.text_input("Specify the company name", key="company_name_tab2")
-
-        cols = st.columns([1, 2, 1])
-        with cols[1]:
-            if st.button("Run GPT Tasks", key="run_gpt_tasks_tab2"):
-                if company_name:
-                    document_contents = {}
-                    all_files_present = True
-                    for file_name in required_files:
-                        file_path = os.path.join("uploads", f"{company_name}_{file_name}")
-                        if os.path.exists(file_path):
-                            document_contents[file_name] = read_pdf(file_path)
-                        else:
-                            st.error(f"File {file_name} not found. Please upload it in the first tab.")
-                            all_files_present = False
-                            break
-
-                    if all_files_present:
-                        # Separate document texts
-                        product_list_text = document_contents.get("product_list.pdf", "")
-                        USP_text = document_contents.get("USP.pdf", "")
-                        key_stats_text = document_contents.get("key_stats.pdf", "")
-                        about_us_text = document_contents.get("about_us.pdf", "")
-                        colour_scheme_text = document_contents.get("colour_scheme.pdf", "")
-
-                        # 1. Buyer Persona
-                        prompt_buyer_persona = prompts["prompt_buyer_persona"].format(company_name=company_name, product_list=product_list_text, USP=USP_text, key_stats=key_stats_text, about_us=about_us_text)
-                        buyer_persona = run_gpt_task(instructions["buyer_persona"], prompt_buyer_persona)
-                        with open(os.path.join("processed", f"{company_name}_buyer_persona.txt"), "w") as f:
-                            f.write(buyer_persona)
-
-                        # 2. English Editor for Buyer Persona
-                        prompt_english_editor = prompts["prompt_english_editor"].format(file_name=f"{company_name}_buyer_persona.txt", file_content=buyer_persona)
-                        english_editor_output = run_gpt_task(instructions["english_editor"], prompt_english_editor)
-                        with open(os.path.join("processed", f"{company_name}_buyer_persona.txt"), "w") as f:
-                            f.write(english_editor_output)
-
-                        # 3. Mission Statement
-                        prompt_mission_statement = prompts["prompt_mission_statement"].format(company_name=company_name, product_list=product_list_text, USP=USP_text, key_stats=key_stats_text, about_us=about_us_text, buyer_persona=buyer_persona)
-                        mission_values = run_gpt_task(instructions["mission_statement"], prompt_mission_statement)
-                        with open(os.path.join("processed", f"{company_name}_mission_values.txt"), "w") as f:
-                            f.write(mission_values)
-
-                        # 4. English Editor for Mission Values
-                        prompt_english_editor_mission = prompts["prompt_english_editor"].format(file_name=f"{company_name}_mission_values.txt", file_content=mission_values)
-                        english_editor_mission_output = run_gpt_task(instructions["english_editor"], prompt_english_editor_mission)
-                        with open(os.path.join("processed", f"{company_name}_mission_values.txt"), "w") as f:
-                            f.write(english_editor_mission_output)
-
-                        # 5. SEO Summarizer
-                        prompt_seo_summarizer = prompts["prompt_seo_summarizer"].format(product_list=product_list_text, USP=USP_text, key_stats=key_stats_text, about_us=about_us_text, buyer_persona=buyer_persona)
-                        seo_summarizer_output = run_gpt_task(instructions["seo_summarizer"], prompt_seo_summarizer)
-                        with open(os.path.join("processed", f"{company_name}_seo_summarizer.txt"), "w") as f:
-                            f.write(seo_summarizer_output)
-
-                        # 6. English Editor for SEO Summarizer
-                        prompt_english_editor_seo = prompts["prompt_english_editor"].format(file_name=f"{company_name}_seo_summarizer.txt", file_content=seo_summarizer_output)
-                        english_editor_seo_output = run_gpt_task(instructions["english_editor"], prompt_english_editor_seo)
-                        with open(os.path.join("processed", f"{company_name}_seo_summarizer.txt"), "w") as f:
-                            f.write(english_editor_seo_output)
-
-                        # 7. SEO Keywords
-                        prompt_magic_words = prompts["prompt_magic_words"].format(english_editor_seo_output=english_editor_seo_output)
-                        seo_keywords = run_gpt_task(instructions["magic_words"], prompt_magic_words)
-                        with open(os.path.join("processed", f"{company_name}_seo_keywords.txt"), "w") as f:
-                            f.write(seo_keywords)
-
-                        
-                        # Brand Voice   
-                        prompt_brand_voice = prompts["prompt_brand_voice"].format(company_name=company_name, product_list=product_list_text, USP=USP_text, key_stats=key_stats_text, about_us=about_us_text, buyer_persona=buyer_persona,keywords = english_editor_seo_output )
-                        brand_voice = run_gpt_task(instructions["brand_voice"], prompt_brand_voice)
-                        with open(os.path.join("processed", f"{company_name}_brand_voice.txt"), "w") as f:
-                            f.write(brand_voice)
-                        
-                        prompt_english_editor_brand = prompts["prompt_english_editor"].format(file_name=f"{company_name}_brand_voice.txt", file_content=brand_voice)
-                        english_editor_brand_output = run_gpt_task(instructions["english_editor"], prompt_english_editor_brand)
-                        with open(os.path.join("processed", f"{company_name}_brand_voice.txt"), "w") as f:
-                            f.write(english_editor_brand_output)
-
-                        # Zip the specific output files for download
-                        with ZipFile(os.path.join("processed", f"{company_name}_specific_outputs_gpt_tasks.zip"), "w") as zipf:
-                            zipf.write(os.path.join("processed", f"{company_name}_buyer_persona.txt"), f"{company_name}_buyer_persona.txt")
-                            zipf.write(os.path.join("processed", f"{company_name}_mission_values.txt"), f"{company_name}_mission_values.txt")
-                            zipf.write(os.path.join("processed", f"{company_name}_seo_summarizer.txt"), f"{company_name}_seo_summarizer.txt")
-                            zipf.write(os.path.join("processed", f"{company_name}_seo_keywords.txt"), f"{company_name}_seo_keywords.txt")
-                            zipf.write(os.path.join("processed", f"{company_name}_brand_voice.txt"), f"{company_name}_brand_voice.txt")
-
-                        st.success("GPT tasks have been executed and files are zipped!")
-
-        # Add download button for this tab's files
-        if os.path.exists("processed"):
-            with ZipFile(os.path.join("processed", f"{company_name}_gpt_tasks.zip"), "w") as zipf:
-                for file in ["buyer_persona.txt", "mission_values.txt", "seo_summarizer.txt", "seo_keywords.txt", "brand_voice.txt"]:
-                    file_path = os.path.join("processed", f"{company_name}_{file}")
+# Function to render the step to build the prep docs
+@profile_step("prep_docs")
+def prep_docs_step():
+    st.markdown("<h1 style='color:white;'>Step 2: Build the Prep Docs</h1>", unsafe_allow_html=True)
+    st.markdown("""
+        <p style='color:black;'>In this step, you will run GPT tasks to process the uploaded documents. </p>
+        <p style='color:black;'>Outcome: The system will then generate outputs such as buyer persona, mission statement, brand voice, SEO summaries, and keywords for further research.</p>
+    """, unsafe_allow_html=True)
+
+    company_name = st.text_input("Specify the company name", key="company_name_tab2")
+
+    cols = st.columns([1, 2, 1])
+    with cols[1]:
+        if st.button("Run GPT Tasks", key="run_gpt_tasks_tab2"):
+            if company_name:
+                document_contents = {}
+                all_files_present = True
+                for file_name in required_files:
+                    file_path = os.path.join("uploads", f"{company_name}_{file_name}")
                     if os.path.exists(file_path):
-                        zipf.write(file_path, file)
+                        document_contents[file_name] = read_pdf(file_path)
+                    else:
+                        st.error(f"File {file_name} not found. Please upload it in the first tab.")
+                        all_files_present = False
+                        break
+
+                if all_files_present:
+                    # Separate document texts
+                    product_list_text = document_contents.get("product_list.pdf", "")
+                    USP_text = document_contents.get("USP.pdf", "")
+                    key_stats_text = document_contents.get("key_stats.pdf", "")
+                    about_us_text = document_contents.get("about_us.pdf", "")
+                    colour_scheme_text = document_contents.get("colour_scheme.pdf", "")
+
+                    # 1. Buyer Persona
+                    prompt_buyer_persona = prompts["prompt_buyer_persona"].format(company_name=company_name, product_list=product_list_text, USP=USP_text, key_stats=key_stats_text, about_us=about_us_text)
+                    buyer_persona = run_gpt_task("buyer_persona", instructions["buyer_persona"], prompt_buyer_persona)
+                    with open(os.path.join("processed", f"{company_name}_buyer_persona.txt"), "w") as f:
+                        f.write(buyer_persona)
+
+                    # 2. English Editor for Buyer Persona
+                    prompt_english_editor = prompts["prompt_english_editor"].format(file_name=f"{company_name}_buyer_persona.txt", file_content=buyer_persona)
+                    english_editor_output = run_gpt_task("buyer_persona_editor", instructions["english_editor"], prompt_english_editor)
+                    with open(os.path.join("processed", f"{company_name}_buyer_persona.txt"), "w") as f:
+                        f.write(english_editor_output)
+
+                    # 3. Mission Statement
+                    prompt_mission_statement = prompts["prompt_mission_statement"].format(company_name=company_name, product_list=product_list_text, USP=USP_text, key_stats=key_stats_text, about_us=about_us_text, buyer_persona=buyer_persona)
+                    mission_values = run_gpt_task("mission_statement", instructions["mission_statement"], prompt_mission_statement)
+                    with open(os.path.join("processed", f"{company_name}_mission_values.txt"), "w") as f:
+                        f.write(mission_values)
+
+                    # 4. English Editor for Mission Values
+                    prompt_english_editor_mission = prompts["prompt_english_editor"].format(file_name=f"{company_name}_mission_values.txt", file_content=mission_values)
+                    english_editor_mission_output = run_gpt_task("mission_statement_editor", instructions["english_editor"], prompt_english_editor_mission)
+                    with open(os.path.join("processed", f"{company_name}_mission_values.txt"), "w") as f:
+                        f.write(english_editor_mission_output)
+
+                    # 5. SEO Summarizer
+                    prompt_seo_summarizer = prompts["prompt_seo_summarizer"].format(product_list=product_list_text, USP=USP_text, key_stats=key_stats_text, about_us=about_us_text, buyer_persona=buyer_persona)
+                    seo_summarizer_output = run_gpt_task("seo_summarizer", instructions["seo_summarizer"], prompt_seo_summarizer)
+                    with open(os.path.join("processed", f"{company_name}_seo_summarizer.txt"), "w") as f:
+                        f.write(seo_summarizer_output)
+
+                    # 6. English Editor for SEO Summarizer
+                    prompt_english_editor_seo = prompts["prompt_english_editor"].format(file_name=f"{company_name}_seo_summarizer.txt", file_content=seo_summarizer_output)
+                    english_editor_seo_output = run_gpt_task("seo_summarizer_editor", instructions["english_editor"], prompt_english_editor_seo)
+                    with open(os.path.join("processed", f"{company_name}_seo_summarizer.txt"), "w") as f:
+                        f.write(english_editor_seo_output)
+
+                    # 7. SEO Keywords
+                    prompt_magic_words = prompts["prompt_magic_words"].format(english_editor_seo_output=english_editor_seo_output)
+                    seo_keywords = run_gpt_task("magic_words", instructions["magic_words"], prompt_magic_words)
+                    with open(os.path.join("processed", f"{company_name}_seo_keywords.txt"), "w") as f:
+                        f.write(seo_keywords)
+
+
+                    # Brand Voice   
+                    prompt_brand_voice = prompts["prompt_brand_voice"].format(company_name=company_name, product_list=product_list_text, USP=USP_text, key_stats=key_stats_text, about_us=about_us_text, buyer_persona=buyer_persona,keywords = english_editor_seo_output )
+                    brand_voice = run_gpt_task("brand_voice", instructions["brand_voice"], prompt_brand_voice)
+                    with open(os.path.join("processed", f"{company_name}_brand_voice.txt"), "w") as f:
+                        f.write(brand_voice)
+
+                    prompt_english_editor_brand = prompts["prompt_english_editor"].format(file_name=f"{company_name}_brand_voice.txt", file_content=brand_voice)
+                    english_editor_brand_output = run_gpt_task("brand_voice_editor", instructions["english_editor"], prompt_english_editor_brand)
+                    with open(os.path.join("processed", f"{company_name}_brand_voice.txt"), "w") as f:
+                        f.write(english_editor_brand_output)
+
+                    # Zip the specific output files for download
+                    with ZipFile(os.path.join("processed", f"{company_name}_specific_outputs_gpt_tasks.zip"), "w") as zipf:
+                        zipf.write(os.path.join("processed", f"{company_name}_buyer_persona.txt"), f"{company_name}_buyer_persona.txt")
+                        zipf.write(os.path.join("processed", f"{company_name}_mission_values.txt"), f"{company_name}_mission_values.txt")
+                        zipf.write(os.path.join("processed", f"{company_name}_seo_summarizer.txt"), f"{company_name}_seo_summarizer.txt")
+                        zipf.write(os.path.join("processed", f"{company_name}_seo_keywords.txt"), f"{company_name}_seo_keywords.txt")
+                        zipf.write(os.path.join("processed", f"{company_name}_brand_voice.txt"), f"{company_name}_brand_voice.txt")
+
+                    st.success("GPT tasks have been executed and files are zipped!")
+
+    # Add download button for this tab's files
+    with profile_step("zip_prep_docs"):
+        if os.path.exists("processed"):
+            refresh_zip(os.path.join("processed", f"{company_name}_gpt_tasks.zip"), [
+                (os.path.join("processed", f"{company_name}_{file}"), file)
+                for file in ["buyer_persona.txt", "mission_values.txt", "seo_summarizer.txt", "seo_keywords.txt", "brand_voice.txt"]
+            ])
             with open(os.path.join("processed", f"{company_name}_gpt_tasks.zip"), "rb") as zipf:
                 cols = st.columns([1, 2, 1])
                 with cols[1]:
@@ -338,119 +1009,67 @@ def main():
                         file_name=f"{company_name}_gpt_tasks.zip"
                     )
 
-   
-    
+# Function to render the step to process and analyze the CSV files
+@profile_step("csv_analysis")
+def csv_analysis_step():
+    st.markdown("<h1 style='color:white;'>Step 3: Process and Analyze CSV Files</h1>", unsafe_allow_html=True)
+    st.markdown("""
+        <p style='color:black;'>In this step, you need to upload CSV files for processing and analysis. The system will analyze the CSV files and generate a list of top 150 keywords based on various criteria.</p>
+        <p style='color:black;'>Outcome: The system will process the CSV files and generate a file containing the top 150 keywords.</p>
+    """, unsafe_allow_html=True)
 
-    
-    
-    
-    with tab3:
-        def process_google_data(file_path, company_name):
-            # Define fixed thresholds
-            competition_threshold = 80
-            search_volume_threshold = 50
-            bid_threshold = 2
-        
-            # Read the CSV file
-            data = pd.read_csv(file_path, encoding='utf-16', delimiter='\t', skiprows=2)
-        
-            # Convert columns to numeric types and handle missing values
-            data['Avg. monthly searches'] = pd.to_numeric(data['Avg. monthly searches'], errors='coerce').fillna(0)
-            data['Competition (indexed value)'] = pd.to_numeric(data['Competition (indexed value)'], errors='coerce').fillna(100)
-            data['Top of page bid (high range)'] = pd.to_numeric(data['Top of page bid (high range)'], errors='coerce').fillna(0)
-        
-            # Filter out highly competitive keywords and those not worth pursuing
-            data = data[(data['Competition (indexed value)'] <= competition_threshold) &
-                        (data['Avg. monthly searches'] >= search_volume_threshold) &
-                        (data['Top of page bid (high range)'] >= bid_threshold)]
-        
-
-        
-            # Initialize Min-Max Scaler
-            scaler = MinMaxScaler()
-        
-            # Normalize each feature using Min-Max scaling
-            data[['Avg. monthly searches', 'Competition (indexed value)', 'Top of page bid (high range)']] = scaler.fit_transform(
-                data[['Avg. monthly searches', 'Competition (indexed value)', 'Top of page bid (high range)']])
-        
-            # Define weights for each factor (adjust as needed)
-            weights = {
-                'Avg. monthly searches': 0.3,
-                'Competition (indexed value)': 0.4,
-                'Top of page bid (high range)': 0.3
-            }
-        
-            # Calculate the combined score using the scaled values
-            data['Score'] = (
-                data['Avg. monthly searches'] * weights['Avg. monthly searches'] +
-                data['Competition (indexed value)'] * weights['Competition (indexed value)'] +
-                data['Top of page bid (high range)'] * weights['Top of page bid (high range)']
-            )
-        
-            # Sort the keywords by the combined score in descending order
-            sorted_keywords = data.sort_values(by='Score', ascending=False)
-        
-            # Select the top 150 keywords
-            top_keywords = sorted_keywords.head(150)
-        
-            return top_keywords
-
-        st.markdown("<h1 style='color:white;'>Step 3: Process and Analyze CSV Files</h1>", unsafe_allow_html=True)
-        st.markdown("""
-            <p style='color:black;'>In this step, you need to upload CSV files for processing and analysis. The system will analyze the CSV files and generate a list of top 150 keywords based on various criteria.</p>
-            <p style='color:black;'>Outcome: The system will process the CSV files and generate a file containing the top 150 keywords.</p>
-        """, unsafe_allow_html=True)
-    
-        company_name = st.text_input("Specify the company name", key="company_name_tab3")
-    
-        csv_files = st.file_uploader("Upload CSV files", type="csv", accept_multiple_files=True, key="csv_files_tab3")
-    
-        cols = st.columns([1, 2, 1])
-        with cols[1]:
-            if st.button("Process CSV Files", key="process_csv_files_tab3"):
-                if company_name:
-                    csv_file_paths = []
-                    for i, file in enumerate(csv_files):
-                        file_path = os.path.join("uploads", f"{company_name}_csv_file_{i + 1}.csv")
-                        with open(file_path, "wb") as f:
-                            f.write(file.getbuffer())
+    company_name = st.text_input("Specify the company name", key="company_name_tab3")
+
+    csv_files = st.file_uploader("Upload CSV files", type="csv", accept_multiple_files=True, key="csv_files_tab3")
+    track_uploader("csv_files_tab3", csv_files)
+
+    cols = st.columns([1, 2, 1])
+    with cols[1]:
+        if st.button("Process CSV Files", key="process_csv_files_tab3"):
+            if company_name:
+                csv_file_paths = []
+                for i, file in enumerate(csv_files):
+                    file_path = save_upload(file, os.path.join("uploads", f"{company_name}_csv_file_{i + 1}.csv"))
+                    if file_path:
                         csv_file_paths.append(file_path)
-    
-                    if csv_file_paths:
-                        all_top_keywords = pd.DataFrame()
-                        for file_path in csv_file_paths:
-                            top_keywords = process_google_data(file_path, company_name)
-                            top_keywords['Source'] = file_path
-                            all_top_keywords = pd.concat([all_top_keywords, top_keywords], ignore_index=True)
-    
-                        # Sort all keywords by score
-                        all_top_keywords = all_top_keywords.sort_values(by='Score', ascending=False)
-    
-                        # Limit to top 150 keywords while ensuring no more than 35 per source
-                        final_top_keywords = pd.DataFrame()
-                        for source in all_top_keywords['Source'].unique():
-                            source_keywords = all_top_keywords[all_top_keywords['Source'] == source]
-                            final_top_keywords = pd.concat([final_top_keywords, source_keywords.head(35)], ignore_index=True)
-    
-                        final_top_keywords = final_top_keywords.head(150)
-    
-                        # Save the final results to a new CSV file
-                        final_output_file = os.path.join("processed", f"{company_name}_top_150_keywords.csv")
-                        os.makedirs("processed", exist_ok=True)
-                        final_top_keywords['Keyword'].to_csv(final_output_file, index=False)
-    
-                        st.success("CSV files processed and top 150 keywords saved!")
-                    else:
-                        st.error("No CSV files found.")
+
+                if csv_file_paths:
+                    import pandas as pd
+
+                    all_top_keywords = pd.DataFrame()
+                    for file_path in csv_file_paths:
+                        top_keywords = process_google_data(file_path, company_name)
+                        top_keywords['Source'] = file_path
+                        all_top_keywords = pd.concat([all_top_keywords, top_keywords], ignore_index=True)
+
+                    # Collapse variants repeated across sources and sort all keywords by score
+                    all_top_keywords = dedupe_keywords(all_top_keywords)
+
+                    # Limit to top 150 keywords while ensuring no more than 35 per source
+                    final_top_keywords = pd.DataFrame()
+                    for source in all_top_keywords['Source'].unique():
+                        source_keywords = all_top_keywords[all_top_keywords['Source'] == source]
+                        final_top_keywords = pd.concat([final_top_keywords, source_keywords.head(35)], ignore_index=True)
+
+                    final_top_keywords = final_top_keywords.head(150)
+
+                    # Save the final results to a new CSV file
+                    final_output_file = os.path.join("processed", f"{company_name}_top_150_keywords.csv")
+                    os.makedirs("processed", exist_ok=True)
+                    final_top_keywords['Keyword'].to_csv(final_output_file, index=False)
+
+                    st.success("CSV files processed and top 150 keywords saved!")
                 else:
-                    st.error("Please specify the company name in the first tab.")
-    
-        # Add download button for this tab's files
+                    st.error("No CSV files found.")
+            else:
+                st.error("Please specify the company name in the first tab.")
+
+    # Add download button for this tab's files
+    with profile_step("zip_csv_analysis"):
         if os.path.exists("processed"):
-            with ZipFile(os.path.join("processed", f"{company_name}_csv_analysis.zip"), "w") as zipf:
-                file_path = os.path.join("processed", f"{company_name}_top_150_keywords.csv")
-                if os.path.exists(file_path):
-                    zipf.write(file_path, "top_150_keywords.csv")
+            refresh_zip(os.path.join("processed", f"{company_name}_csv_analysis.zip"), [
+                (os.path.join("processed", f"{company_name}_top_150_keywords.csv"), "top_150_keywords.csv")
+            ])
             with open(os.path.join("processed", f"{company_name}_csv_analysis.zip"), "rb") as zipf:
                 cols = st.columns([1, 2, 1])
                 with cols[1]:
@@ -459,127 +1078,133 @@ def main():
                         data=zipf,
                         file_name=f"{company_name}_csv_analysis.zip"
                     )
-    
-    
 
-    
-    with tab4:
-        st.markdown("<h1 style='color:white;'>Step 4: Generate Website Content</h1>", unsafe_allow_html=True)
-        st.markdown("""
-            <p style='color:black;'>In this step, you will generate topic clusters, website structure, and web page content based on uploaded documents and processed data.</p>
-        """, unsafe_allow_html=True)
-
-        company_name = st.text_input("Specify the company name", key="company_name_tab4")
-
-        cols = st.columns([1, 2, 1])
-        with cols[1]:
-            if st.button("Generate Website Content", key="generate_website_content_tab4"):
-                if company_name:
-                    document_contents = {}
-                    for file_name in required_files:
-                        file_path = os.path.join("uploads", f"{company_name}_{file_name}")
-                        if os.path.exists(file_path):
-                            document_contents[file_name] = read_pdf(file_path)
+# Function to render the step to generate the website content
+@profile_step("website_content")
+def website_content_step():
+    st.markdown("<h1 style='color:white;'>Step 4: Generate Website Content</h1>", unsafe_allow_html=True)
+    st.markdown("""
+        <p style='color:black;'>In this step, you will generate topic clusters, website structure, and web page content based on uploaded documents and processed data.</p>
+    """, unsafe_allow_html=True)
 
-                    product_list_text = document_contents.get("product_list.pdf", "")
-                    USP_text = document_contents.get("USP.pdf", "")
-                    key_stats_text = document_contents.get("key_stats.pdf", "")
-                    about_us_text = document_contents.get("about_us.pdf", "")
-                    colour_scheme_text = document_contents.get("colour_scheme.pdf", "")
-                    brand_voice_text = document_contents.get("brand_voice.pdf", "")
-
-                    with open(os.path.join("processed", f"{company_name}_buyer_persona.txt"), "r") as f:
-                        buyer_persona = f.read()
-                    with open(os.path.join("processed", f"{company_name}_top_150_keywords.csv"), "r") as f:
-                        top_keywords = f.read()
-                    with open(os.path.join("processed", f"{company_name}_mission_values.txt"), "r") as f:
-                        mission_values = f.read()
-                    with open(os.path.join("processed", f"{company_name}_brand_voice.txt"), "r") as f:
-                        brand_voice_text = f.read()
-
-                    # 1. Topic Cluster Analysis
-                    prompt_topic_cluster = prompts["prompt_topic_cluster"].format(company_name=company_name, product_list=product_list_text,  buyer_persona=buyer_persona, seo_keywords=top_keywords)
-                    topic_cluster_document = run_gpt_task(instructions["topic_cluster"], prompt_topic_cluster)
-                    with open(os.path.join("processed", f"{company_name}_topic_cluster_document.txt"), "w") as f:
-                        f.write(topic_cluster_document)
-
-                    
-                    prompt_english_topic_cluster= prompts["prompt_english_editor"].format(file_name=f"{company_name}_topic_cluster_document.txt", file_content=topic_cluster_document)
-                    topic_cluster_document = run_gpt_task(instructions["english_editor"], prompt_english_topic_cluster)
-                    with open(os.path.join("processed", f"{company_name}_topic_cluster_document.txt"), "w") as f:
-                        f.write(topic_cluster_document)
-                    
-                    prompt_extract_keywords = prompts["prompt_extract_keywords"].format(topic_cluster_document=topic_cluster_document)
-                    keywords = run_gpt_task(instructions["editor"], prompt_extract_keywords)
-                    with open(os.path.join("processed", f"{company_name}_keywords.txt"), "w") as f:
-                        f.write(keywords)
-
-                    prompt_website_structure = prompts["prompt_website_structure"].format(company_name=company_name, product_list=product_list_text, USP=USP_text, key_stats=key_stats_text, about_us=about_us_text, buyer_persona=buyer_persona, topic_cluster_document=topic_cluster_document, keywords=keywords)
-                    website_structure_document = run_gpt_task(instructions["website_structure"], prompt_website_structure)
-                    with open(os.path.join("processed", f"{company_name}_website_structure_document.txt"), "w") as f:
-                        f.write(website_structure_document)
-
-                    prompt_extract_home_page = prompts["prompt_extract_home_page"].format(website_structure_document=website_structure_document)
-                    home_page_structure = run_gpt_task(instructions["editor"], prompt_extract_home_page)
-                        
-                    with open(os.path.join("processed", f"{company_name}_keywords.txt"), "r") as f:
-                        keywords = f.read()
-
-                    prompt_home_page = prompts["prompt_home_page"].format(company_name=company_name, product_list=product_list_text, USP=USP_text, key_stats=key_stats_text, about_us=about_us_text, brand_voice_text=brand_voice_text, keywords=keywords)
-                    home_page_document = run_gpt_task(instructions["home_page"], prompt_home_page)
-                    with open(os.path.join("processed", f"{company_name}_home_page.txt"), "w") as f:
-                        f.write(home_page_document)
-
-                    prompt_english_editor_home = prompts["prompt_english_editor"].format(file_name=f"{company_name}_home_page.txt", file_content=home_page_document)
-                    home_page_final = run_gpt_task(instructions["english_editor"], prompt_english_editor_home)
-                    with open(os.path.join("processed", f"{company_name}_home_page_final.txt"), "w") as f:
-                        f.write(home_page_final)
-
-                    prompt_extract_about_us = prompts["prompt_extract_about_us"].format(website_structure_document=website_structure_document)
-                    about_us_structure = run_gpt_task(instructions["editor"], prompt_extract_about_us)
-
-                    prompt_about_us = prompts["prompt_about_us"].format(company_name=company_name, product_list=product_list_text, USP=USP_text, key_stats=key_stats_text, about_us=about_us_text,  brand_voice_text=brand_voice_text, keywords=keywords)
-                    about_us_document = run_gpt_task(instructions["about_us"], prompt_about_us)
-                    with open(os.path.join("processed", f"{company_name}_about_us.txt"), "w") as f:
-                        f.write(about_us_document)
-
-                    prompt_english_editor_about_us = prompts["prompt_english_editor"].format(file_name=f"{company_name}_about_us.txt", file_content=about_us_document)
-                    about_us_final = run_gpt_task(instructions["english_editor"], prompt_english_editor_about_us)
-                    with open(os.path.join("processed", f"{company_name}_about_us_final.txt"), "w") as f:
-                        f.write(about_us_final)
-
-                    # 6. Services Page
-                    prompt_services_page = prompts["prompt_services_page"].format(company_name=company_name, product_list=product_list_text, USP=USP_text, key_stats=key_stats_text, about_us=about_us_text,  brand_voice_text=brand_voice_text, keywords=keywords)
-                    services_page_document = run_gpt_task(instructions["products_page"], prompt_services_page)
-                    with open(os.path.join("processed", f"{company_name}services_page.txt"), "w") as f:
-                        f.write(services_page_document)
-                   
-                    
-                    # English Editor for Services Page
-                    prompt_english_editor_services = prompts["prompt_english_editor"].format(file_name="{company_name}_services_page.txt", file_content=services_page_document)
-                    services_page_final = run_gpt_task(instructions["english_editor"], prompt_english_editor_services)
-                    with open(os.path.join("processed", f"{company_name}_services_page_final.txt"), "w") as f:
-                        f.write(services_page_final)
-
-                    
-                    # Zip the specific outputs for download
-                    with ZipFile(os.path.join("processed", f"{company_name}_specific_outputs_website_content.zip"), "w") as zipf:
-                        zipf.write(os.path.join("processed", f"{company_name}_topic_cluster_document.txt"), f"{company_name}_topic_cluster_document.txt")
-                        zipf.write(os.path.join("processed", f"{company_name}_keywords.txt"), f"{company_name}_keywords.txt")
-                        zipf.write(os.path.join("processed", f"{company_name}_website_structure_document.txt"), f"{company_name}_website_structure_document.txt")
-                        zipf.write(os.path.join("processed", f"{company_name}_home_page_final.txt"), f"{company_name}_home_page_final.txt")
-                        zipf.write(os.path.join("processed", f"{company_name}_about_us_final.txt"), f"{company_name}_about_us_final.txt")
-                        zipf.write(os.path.join("processed", f"{company_name}_services_page_final.txt"), f"{company_name}_services_page_final.txt")
-
-                    st.success("Website content has been generated and zipped!")
-
-        # Add download button for this tab's files
-        if os.path.exists("processed"):
-            with ZipFile(os.path.join("processed", f"{company_name}_website_content.zip"), "w") as zipf:
-                for file in ["topic_cluster_document.txt", "keywords.txt", "website_structure_document.txt", "brand_voice.txt",  "home_page_final.txt",  "about_us_final.txt",  "services_page_final.txt"]:
-                    file_path = os.path.join("processed", f"{company_name}_{file}")
+    company_name = st.text_input("Specify the company name", key="company_name_tab4")
+
+    cols = st.columns([1, 2, 1])
+    with cols[1]:
+        if st.button("Generate Website Content", key="generate_website_content_tab4"):
+            if company_name:
+                document_contents = {}
+                for file_name in required_files:
+                    file_path = os.path.join("uploads", f"{company_name}_{file_name}")
                     if os.path.exists(file_path):
-                        zipf.write(file_path, file)
+                        document_contents[file_name] = read_pdf(file_path)
+
+                product_list_text = document_contents.get("product_list.pdf", "")
+                USP_text = document_contents.get("USP.pdf", "")
+                key_stats_text = document_contents.get("key_stats.pdf", "")
+                about_us_text = document_contents.get("about_us.pdf", "")
+                colour_scheme_text = document_contents.get("colour_scheme.pdf", "")
+                brand_voice_text = document_contents.get("brand_voice.pdf", "")
+
+                with open(os.path.join("processed", f"{company_name}_buyer_persona.txt"), "r") as f:
+                    buyer_persona = f.read()
+                with open(os.path.join("processed", f"{company_name}_top_150_keywords.csv"), "r") as f:
+                    top_keywords = f.read()
+                with open(os.path.join("processed", f"{company_name}_mission_values.txt"), "r") as f:
+                    mission_values = f.read()
+                with open(os.path.join("processed", f"{company_name}_brand_voice.txt"), "r") as f:
+                    brand_voice_text = f.read()
+
+                # 1. Topic Cluster Analysis
+                prompt_topic_cluster = prompts["prompt_topic_cluster"].format(company_name=company_name, product_list=product_list_text,  buyer_persona=buyer_persona, seo_keywords=top_keywords)
+                topic_cluster_document = run_gpt_task("topic_cluster", instructions["topic_cluster"], prompt_topic_cluster)
+                with open(os.path.join("processed", f"{company_name}_topic_cluster_document.txt"), "w") as f:
+                    f.write(topic_cluster_document)
+
+
+                prompt_english_topic_cluster= prompts["prompt_english_editor"].format(file_name=f"{company_name}_topic_cluster_document.txt", file_content=topic_cluster_document)
+                topic_cluster_document = run_gpt_task("topic_cluster_editor", instructions["english_editor"], prompt_english_topic_cluster)
+                with open(os.path.join("processed", f"{company_name}_topic_cluster_document.txt"), "w") as f:
+                    f.write(topic_cluster_document)
+
+                prompt_extract_keywords = prompts["prompt_extract_keywords"].format(topic_cluster_document=topic_cluster_document)
+                extracted_keywords = run_gpt_json_task("extract_keywords", instructions["extractor"], prompt_extract_keywords, "keywords", max_tokens=4000)
+                with open(os.path.join("processed", f"{company_name}_keywords.json"), "w") as f:
+                    json.dump(extracted_keywords, f)
+                keywords = ", ".join(extracted_keywords["keywords"])
+                with open(os.path.join("processed", f"{company_name}_keywords.txt"), "w") as f:
+                    f.write(keywords)
+
+                prompt_website_structure = prompts["prompt_website_structure"].format(company_name=company_name, product_list=product_list_text, USP=USP_text, key_stats=key_stats_text, about_us=about_us_text, buyer_persona=buyer_persona, topic_cluster_document=topic_cluster_document, keywords=keywords)
+                website_structure_document = run_gpt_task("website_structure", instructions["website_structure"], prompt_website_structure)
+                with open(os.path.join("processed", f"{company_name}_website_structure_document.txt"), "w") as f:
+                    f.write(website_structure_document)
+
+                prompt_extract_home_page = prompts["prompt_extract_home_page"].format(website_structure_document=website_structure_document)
+                home_page_structure = run_gpt_json_task("extract_home_page", instructions["extractor"], prompt_extract_home_page, "page_structure")
+                with open(os.path.join("processed", f"{company_name}_home_page_structure.json"), "w") as f:
+                    json.dump(home_page_structure, f)
+
+                with open(os.path.join("processed", f"{company_name}_keywords.txt"), "r") as f:
+                    keywords = f.read()
+
+                prompt_home_page = prompts["prompt_home_page"].format(company_name=company_name, product_list=product_list_text, USP=USP_text, key_stats=key_stats_text, about_us=about_us_text, brand_voice_text=brand_voice_text, keywords=keywords, page_structure=compact_json(home_page_structure))
+                home_page_document = run_gpt_task("home_page", instructions["home_page"], prompt_home_page)
+                with open(os.path.join("processed", f"{company_name}_home_page.txt"), "w") as f:
+                    f.write(home_page_document)
+
+                prompt_english_editor_home = prompts["prompt_english_editor"].format(file_name=f"{company_name}_home_page.txt", file_content=home_page_document)
+                home_page_final = run_gpt_task("home_page_editor", instructions["english_editor"], prompt_english_editor_home)
+                with open(os.path.join("processed", f"{company_name}_home_page_final.txt"), "w") as f:
+                    f.write(home_page_final)
+
+                prompt_extract_about_us = prompts["prompt_extract_about_us"].format(website_structure_document=website_structure_document)
+                about_us_structure = run_gpt_json_task("extract_about_us", instructions["extractor"], prompt_extract_about_us, "page_structure")
+                with open(os.path.join("processed", f"{company_name}_about_us_structure.json"), "w") as f:
+                    json.dump(about_us_structure, f)
+
+                prompt_about_us = prompts["prompt_about_us"].format(company_name=company_name, product_list=product_list_text, USP=USP_text, key_stats=key_stats_text, about_us=about_us_text,  brand_voice_text=brand_voice_text, keywords=keywords, page_structure=compact_json(about_us_structure))
+                about_us_document = run_gpt_task("about_us", instructions["about_us"], prompt_about_us)
+                with open(os.path.join("processed", f"{company_name}_about_us.txt"), "w") as f:
+                    f.write(about_us_document)
+
+                prompt_english_editor_about_us = prompts["prompt_english_editor"].format(file_name=f"{company_name}_about_us.txt", file_content=about_us_document)
+                about_us_final = run_gpt_task("about_us_editor", instructions["english_editor"], prompt_english_editor_about_us)
+                with open(os.path.join("processed", f"{company_name}_about_us_final.txt"), "w") as f:
+                    f.write(about_us_final)
+
+                # 6. Services Page
+                prompt_services_page = prompts["prompt_services_page"].format(company_name=company_name, product_list=product_list_text, USP=USP_text, key_stats=key_stats_text, about_us=about_us_text,  brand_voice_text=brand_voice_text, keywords=keywords)
+                services_page_document = run_gpt_task("services_page", instructions["products_page"], prompt_services_page)
+                with open(os.path.join("processed", f"{company_name}services_page.txt"), "w") as f:
+                    f.write(services_page_document)
+
+
+                # English Editor for Services Page
+                prompt_english_editor_services = prompts["prompt_english_editor"].format(file_name="{company_name}_services_page.txt", file_content=services_page_document)
+                services_page_final = run_gpt_task("services_page_editor", instructions["english_editor"], prompt_english_editor_services)
+                with open(os.path.join("processed", f"{company_name}_services_page_final.txt"), "w") as f:
+                    f.write(services_page_final)
+
+
+                # Zip the specific outputs for download
+                with ZipFile(os.path.join("processed", f"{company_name}_specific_outputs_website_content.zip"), "w") as zipf:
+                    zipf.write(os.path.join("processed", f"{company_name}_topic_cluster_document.txt"), f"{company_name}_topic_cluster_document.txt")
+                    zipf.write(os.path.join("processed", f"{company_name}_keywords.txt"), f"{company_name}_keywords.txt")
+                    zipf.write(os.path.join("processed", f"{company_name}_website_structure_document.txt"), f"{company_name}_website_structure_document.txt")
+                    zipf.write(os.path.join("processed", f"{company_name}_home_page_final.txt"), f"{company_name}_home_page_final.txt")
+                    zipf.write(os.path.join("processed", f"{company_name}_about_us_final.txt"), f"{company_name}_about_us_final.txt")
+                    zipf.write(os.path.join("processed", f"{company_name}_services_page_final.txt"), f"{company_name}_services_page_final.txt")
+
+                st.success("Website content has been generated and zipped!")
+
+    # Add download button for this tab's files
+    with profile_step("zip_website_content"):
+        if os.path.exists("processed"):
+            refresh_zip(os.path.join("processed", f"{company_name}_website_content.zip"), [
+                (os.path.join("processed", f"{company_name}_{file}"), file)
+                for file in ["topic_cluster_document.txt", "keywords.txt", "website_structure_document.txt", "brand_voice.txt",  "home_page_final.txt",  "about_us_final.txt",  "services_page_final.txt"]
+            ])
             with open(os.path.join("processed", f"{company_name}_website_content.zip"), "rb") as zipf:
                 cols = st.columns([1, 2, 1])
                 with cols[1]:
@@ -589,100 +1214,100 @@ def main():
                         file_name=f"{company_name}_website_content.zip"
                     )
 
-    with tab5:
-        st.markdown("<h1 style='color:white;'>Step 5: Create Pillar Page</h1>", unsafe_allow_html=True)
-        st.markdown("""
-            <p style='color:black;'>In this step, you will enter the content or upload a Pillar Page PDF document.</p>
-            <p style='color:black;'>Outcome: The system will generate and edit the content of the pillar page based on the provided text or document.</p>
-        """, unsafe_allow_html=True)
+# Function to render the step to create the pillar page
+@profile_step("pillar_page")
+def pillar_page_step():
+    st.markdown("<h1 style='color:white;'>Step 5: Create Pillar Page</h1>", unsafe_allow_html=True)
+    st.markdown("""
+        <p style='color:black;'>In this step, you will enter the content or upload a Pillar Page PDF document.</p>
+        <p style='color:black;'>Outcome: The system will generate and edit the content of the pillar page based on the provided text or document.</p>
+    """, unsafe_allow_html=True)
 
-        company_name = st.text_input("Specify the company name", key="company_name_tab5")
+    company_name = st.text_input("Specify the company name", key="company_name_tab5")
 
-        # Text input for prompt
-        pillar_page_text = st.text_area("Enter the content for the Pillar Page", key="pillar_page_text_tab5")
+    # Text input for prompt
+    pillar_page_text = st.text_area("Enter the content for the Pillar Page", key="pillar_page_text_tab5")
 
-        # Option to upload a PDF as before
-        pillar_page_file = st.file_uploader("Or upload a Pillar Page PDF", type="pdf", key="pillar_page_file_tab5")
+    # Option to upload a PDF as before
+    pillar_page_file = st.file_uploader("Or upload a Pillar Page PDF", type="pdf", key="pillar_page_file_tab5")
+    track_uploader("pillar_page_file_tab5", pillar_page_file)
 
-        # Process the entered text or uploaded PDF
-        if pillar_page_file:
-            pillar_page_path = os.path.join("uploads", f"{company_name}_pillar_page.pdf")
-            with open(pillar_page_path, "wb") as f:
-                f.write(pillar_page_file.getbuffer())
+    # Process the entered text or uploaded PDF
+    pillar_page_path = None
+    if pillar_page_file:
+        pillar_page_path = save_upload(pillar_page_file, os.path.join("uploads", f"{company_name}_pillar_page.pdf"))
+    # The uploaded PDF is only read when the pillar page is processed
+    pillar_page_content = pillar_page_text
 
-            pillar_page_content = read_pdf(pillar_page_path)
-        else:
-            pillar_page_content = pillar_page_text
-
-        cols = st.columns([1, 2, 1])
-        with cols[1]:
-            if st.button("Process Pillar Page", key="process_pillar_page_tab5"):
-                if company_name:
-                    # Read content from the saved PDFs
-                    document_contents = {}
-                    for file_name in required_files:
-                        file_path = os.path.join("uploads", f"{company_name}_{file_name}")
-                        if os.path.exists(file_path):
-                            document_contents[file_name] = read_pdf(file_path)
-
-                    # Separate document texts
-                    product_list_text = document_contents.get("product_list.pdf", "")
-                    USP_text = document_contents.get("USP.pdf", "")
-                    key_stats_text = document_contents.get("key_stats.pdf", "")
-                    about_us_text = document_contents.get("about_us.pdf", "")
-                    colour_scheme_text = document_contents.get("colour_scheme.pdf", "")
-
-                    # Read the existing files
-                    with open(os.path.join("processed", f"{company_name}_buyer_persona.txt"), "r") as f:
-                        buyer_persona = f.read()
-                    with open(os.path.join("processed", f"{company_name}_top_150_keywords.csv"), "r") as f:
-                        top_keywords = f.read()
-                    with open(os.path.join("processed", f"{company_name}_mission_values.txt"), "r") as f:
-                        mission_values = f.read()
-                    with open(os.path.join("processed", f"{company_name}_brand_voice.txt"), "r") as f:
-                        brand_voice = f.read()
-                    with open(os.path.join("processed", f"{company_name}_keywords.txt"), "r") as f:
-                        keywords = f.read()
-
-                    # Ensure pillar_page_content is read only if pillar_page_file was uploaded
-                    if pillar_page_file:
-                        pillar_page_content = read_pdf(pillar_page_path)
-
-                    # Generate the prompt for the pillar page
-                    prompt_pillar_page = prompts["prompt_pillar_page"].format(
-                        company_name=company_name, 
-                        pillar_page_content=pillar_page_content, 
-                        product_list=product_list_text, 
-                        USP=USP_text, 
-                        key_stats=key_stats_text, 
-                        about_us=about_us_text, 
-                        brand_voice_text=brand_voice, 
-                        keywords=keywords
-                    )
-                    pillar_page_document = run_gpt_task(instructions["pillar_page"], prompt_pillar_page)
-                    with open(os.path.join("processed", f"{company_name}_pillar_page.txt"), "w") as f:
-                        f.write(pillar_page_document)
+    cols = st.columns([1, 2, 1])
+    with cols[1]:
+        if st.button("Process Pillar Page", key="process_pillar_page_tab5"):
+            if company_name:
+                # Read content from the saved PDFs
+                document_contents = {}
+                for file_name in required_files:
+                    file_path = os.path.join("uploads", f"{company_name}_{file_name}")
+                    if os.path.exists(file_path):
+                        document_contents[file_name] = read_pdf(file_path)
+
+                # Separate document texts
+                product_list_text = document_contents.get("product_list.pdf", "")
+                USP_text = document_contents.get("USP.pdf", "")
+                key_stats_text = document_contents.get("key_stats.pdf", "")
+                about_us_text = document_contents.get("about_us.pdf", "")
+                colour_scheme_text = document_contents.get("colour_scheme.pdf", "")
+
+                # Read the existing files
+                with open(os.path.join("processed", f"{company_name}_buyer_persona.txt"), "r") as f:
+                    buyer_persona = f.read()
+                with open(os.path.join("processed", f"{company_name}_top_150_keywords.csv"), "r") as f:
+                    top_keywords = f.read()
+                with open(os.path.join("processed", f"{company_name}_mission_values.txt"), "r") as f:
+                    mission_values = f.read()
+                with open(os.path.join("processed", f"{company_name}_brand_voice.txt"), "r") as f:
+                    brand_voice = f.read()
+                with open(os.path.join("processed", f"{company_name}_keywords.txt"), "r") as f:
+                    keywords = f.read()
+
+                # Ensure pillar_page_content is read only if pillar_page_file was uploaded
+                if pillar_page_path:
+                    pillar_page_content = read_pdf(pillar_page_path)
+
+                # Generate the prompt for the pillar page
+                prompt_pillar_page = prompts["prompt_pillar_page"].format(
+                    company_name=company_name, 
+                    pillar_page_content=pillar_page_content, 
+                    product_list=product_list_text, 
+                    USP=USP_text, 
+                    key_stats=key_stats_text, 
+                    about_us=about_us_text, 
+                    brand_voice_text=brand_voice, 
+                    keywords=keywords
+                )
+                pillar_page_document = run_gpt_task("pillar_page", instructions["pillar_page"], prompt_pillar_page)
+                with open(os.path.join("processed", f"{company_name}_pillar_page.txt"), "w") as f:
+                    f.write(pillar_page_document)
 
-                    # English Editor for Pillar Page
-                    prompt_english_editor_pillar = prompts["prompt_english_editor"].format(file_name=f"{company_name}_pillar_page.txt", file_content=pillar_page_document)
-                    pillar_page_final = run_gpt_task(instructions["english_editor"], prompt_english_editor_pillar)
-                    with open(os.path.join("processed", f"{company_name}_pillar_page_final.txt"), "w") as f:
-                        f.write(pillar_page_final)
+                # English Editor for Pillar Page
+                prompt_english_editor_pillar = prompts["prompt_english_editor"].format(file_name=f"{company_name}_pillar_page.txt", file_content=pillar_page_document)
+                pillar_page_final = run_gpt_task("pillar_page_editor", instructions["english_editor"], prompt_english_editor_pillar)
+                with open(os.path.join("processed", f"{company_name}_pillar_page_final.txt"), "w") as f:
+                    f.write(pillar_page_final)
 
-                    # Zip the pillar page files for download
-                    with ZipFile(os.path.join("processed", f"{company_name}_specific_outputs_pillar_page.zip"), "w") as zipf:
-                        zipf.write(os.path.join("processed", f"{company_name}_pillar_page.txt"), f"{company_name}_pillar_page.txt")
-                        zipf.write(os.path.join("processed", f"{company_name}_pillar_page_final.txt"), f"{company_name}_pillar_page_final.txt")
+                # Zip the pillar page files for download
+                with ZipFile(os.path.join("processed", f"{company_name}_specific_outputs_pillar_page.zip"), "w") as zipf:
+                    zipf.write(os.path.join("processed", f"{company_name}_pillar_page.txt"), f"{company_name}_pillar_page.txt")
+                    zipf.write(os.path.join("processed", f"{company_name}_pillar_page_final.txt"), f"{company_name}_pillar_page_final.txt")
 
-                    st.success("Pillar page has been processed and edited!")
+                st.success("Pillar page has been processed and edited!")
 
-        # Add download button for this tab's files
+    # Add download button for this tab's files
+    with profile_step("zip_pillar_page"):
         if os.path.exists("processed"):
-            with ZipFile(os.path.join("processed", f"{company_name}_pillar_page.zip"), "w") as zipf:
-                for file in ["pillar_page.txt", "pillar_page_final.txt"]:
-                    file_path = os.path.join("processed", f"{company_name}_{file}")
-                    if os.path.exists(file_path):
-                        zipf.write(file_path, file)
+            refresh_zip(os.path.join("processed", f"{company_name}_pillar_page.zip"), [
+                (os.path.join("processed", f"{company_name}_{file}"), file)
+                for file in ["pillar_page.txt", "pillar_page_final.txt"]
+            ])
             with open(os.path.join("processed", f"{company_name}_pillar_page.zip"), "rb") as zipf:
                 cols = st.columns([1, 2, 1])
                 with cols[1]:
@@ -692,63 +1317,117 @@ def main():
                         file_name=f"{company_name}_pillar_page.zip"
                     )
 
-    with tab6:
-        st.markdown("<h1 style='color:white;'>Step 6: Download & Overwrite Files</h1>", unsafe_allow_html=True)
-        st.markdown("""
-            <p style='color:black;'>In this step, you can download and re-upload processed files for further editing.</p>
-            <p style='color:black;'>Outcome: The system allows you to download the generated files and re-upload any edited versions.</p>
-        """, unsafe_allow_html=True)
-
-        company_name = st.text_input("Specify the company name", key="company_name_tab6")
-
-        if company_name:
-            file_dict = {}
-
-            # Scan the 'processed' folder for files
-            for root, dirs, files in os.walk("processed"):
-                for file in files:
-                    if company_name in file:
-                        file_path = os.path.join(root, file)
-                        base_name, ext = os.path.splitext(file)
-
-                        # Check if the file has a final version
-                        final_version = f"{base_name}_final{ext}"
-                        if final_version in files:
-                            file_to_offer = final_version
-                        else:
-                            file_to_offer = file
-
-                        # Store the file paths for download
-                        file_dict[file_to_offer] = os.path.join(root, file_to_offer)
-
-            if file_dict:
-                st.success("Select a file from the dropdown menu to download!")  # <-- Line with error
-                # Create a dropdown menu for file selection
-                selected_file = st.selectbox("Select a file to download", options=list(file_dict.keys()))
-
-                if selected_file:
-                    file_path = file_dict[selected_file]
-                    with open(file_path, "rb") as f:
-                        cols = st.columns([1, 2, 1])
-                        with cols[1]:
-                            st.download_button(
-                                label=f"Download {selected_file}",
-                                data=f,
-                                file_name=selected_file
-                            )
-
-                    # Upload button to re-upload the downloaded file
-                    uploaded_file = st.file_uploader("Re-upload the downloaded file (CSV or PDF)", type=["csv", "pdf", "txt"], key="tab6_file_uploader")
-                    if uploaded_file:
-                        new_file_path = os.path.join("processed", f"{uploaded_file.name}")
-                        with open(new_file_path, "wb") as f:
-                            f.write(uploaded_file.getbuffer())
+# Function to render the step to download and overwrite files
+@profile_step("download_files")
+def download_files_step():
+    st.markdown("<h1 style='color:white;'>Step 6: Download & Overwrite Files</h1>", unsafe_allow_html=True)
+    st.markdown("""
+        <p style='color:black;'>In this step, you can download and re-upload processed files for further editing.</p>
+        <p style='color:black;'>Outcome: The system allows you to download the generated files and re-upload any edited versions.</p>
+    """, unsafe_allow_html=True)
+
+    company_name = st.text_input("Specify the company name", key="company_name_tab6")
+
+    if company_name:
+        file_dict = {}
+
+        # Scan the 'processed' folder for files
+        for root, dirs, files in os.walk("processed"):
+            for file in files:
+                if company_name in file:
+                    file_path = os.path.join(root, file)
+                    base_name, ext = os.path.splitext(file)
+
+                    # Check if the file has a final version
+                    final_version = f"{base_name}_final{ext}"
+                    if final_version in files:
+                        file_to_offer = final_version
+                    else:
+                        file_to_offer = file
+
+                    # Store the file paths for download
+                    file_dict[file_to_offer] = os.path.join(root, file_to_offer)
+
+        if file_dict:
+            st.success("Select a file from the dropdown menu to download!")  # <-- Line with error
+            # Create a dropdown menu for file selection
+            selected_file = st.selectbox("Select a file to download", options=list(file_dict.keys()))
+
+            if selected_file:
+                file_path = file_dict[selected_file]
+                with open(file_path, "rb") as f:
+                    cols = st.columns([1, 2, 1])
+                    with cols[1]:
+                        st.download_button(
+                            label=f"Download {selected_file}",
+                            data=f,
+                            file_name=selected_file
+                        )
+
+                # Upload button to re-upload the downloaded file
+                uploaded_file = st.file_uploader("Re-upload the downloaded file (CSV or PDF)", type=["csv", "pdf", "txt"], key="tab6_file_uploader")
+                track_uploader("tab6_file_uploader", uploaded_file)
+                if uploaded_file:
+                    new_file_path = os.path.join("processed", f"{uploaded_file.name}")
+                    # Copied rather than linked, later steps rewrite processed files in place; only copied once
+                    # per upload, so files regenerated since then are not overwritten on later reruns
+                    if st.session_state.get('tab6_reuploaded') != upload_key(uploaded_file):
+                        stored_path = spool_upload(uploaded_file)
+                        if stored_path:
+                            shutil.copyfile(stored_path, new_file_path)
+                            st.session_state['tab6_reuploaded'] = upload_key(uploaded_file)
+                    if st.session_state.get('tab6_reuploaded') == upload_key(uploaded_file):
                         st.success(f"File {uploaded_file.name} has been re-uploaded and saved as {new_file_path}")
-            else:
-                st.warning("No files found for the specified company.")
         else:
-            st.error("Please specify the company name in the first tab.")
+            st.warning("No files found for the specified company.")
+    else:
+        st.error("Please specify the company name in the first tab.")
+
+# Steps of the app, only the selected one is run on each rerun
+steps = {
+    "Upload Required Documents": upload_documents_step,
+    "Prep Docs": prep_docs_step,
+    "Process and Analyze CSV Files": csv_analysis_step,
+    "Generate Website Content": website_content_step,
+    "Create Pillar Page": pillar_page_step,
+    "Download & Overwrite Files": download_files_step
+}
+
+# Widgets of the steps that are not shown are not rendered, so their values are carried over explicitly
+persisted_widget_keys = [
+    "company_name_tab2",
+    "company_name_tab3",
+    "company_name_tab4",
+    "company_name_tab5",
+    "pillar_page_text_tab5",
+    "company_name_tab6"
+]
+
+@profile_step("main")
+def main():
+    
+    st.markdown("<h1 style='color:white;'>Build The Brand</h1>", unsafe_allow_html=True)
+
+    # Initialize session state for company_name and uploaded_files
+    if 'company_name' not in st.session_state:
+        st.session_state.company_name = ''
+    
+    if 'uploaded_files' not in st.session_state:
+        st.session_state.uploaded_files = {}
 
+    for key in persisted_widget_keys:
+        if key in st.session_state:
+            st.session_state[key] = st.session_state[key]
+
+    # Steps: Upload documents and specify company name, Run GPT Tasks, Upload CSV Files, Download Specific Outputs, Upload Pillar Page
+    active_step = st.radio("Step", list(steps), horizontal=True, key="active_step", label_visibility="collapsed")
+    # Switching steps removes the previous step's uploaders, and Streamlit releases the files they held
+    if st.session_state.get('held_uploads_step') != active_step:
+        st.session_state['held_uploads'] = {}
+        st.session_state['held_uploads_step'] = active_step
+    steps[active_step]()
+
+@profile_step("login")
 def login():
     st.markdown("<h1 style='color:white;'>Login</h1>", unsafe_allow_html=True)
     username = st.text_input("Username", key="login_username")
@@ -768,10 +1447,12 @@ def login():
                 st.error("Username not found")
 
 if __name__ == "__main__":
-    if 'logged_in' not in st.session_state:
-        st.session_state['logged_in'] = False
-    if not st.session_state['logged_in']:
-        add_user()
-        login()
-    else:
-        main()
+    with profile_rerun():
+        apply_page_styles()
+        if 'logged_in' not in st.session_state:
+            st.session_state['logged_in'] = False
+        if not st.session_state['logged_in']:
+            add_user()
+            login()
+        else:
+            main()
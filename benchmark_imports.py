@@ -0,0 +1,71 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+# Imports `app` in a fresh interpreter, like a new Streamlit worker serving the login screen,
+# and reports how long it took, peak memory and which heavy dependencies got loaded.
+# app reads st.secrets at import time, so .streamlit/secrets.toml must exist where this runs.
+# ru_maxrss is in kilobytes on Linux and in bytes on macOS.
+PROBE = """
+import json, resource, sys, time
+start = time.perf_counter()
+import app
+elapsed = time.perf_counter() - start
+heavy = ["openai", "PyPDF2", "pandas", "numpy", "sklearn", "scipy"]
+print(json.dumps({
+    "seconds": elapsed,
+    "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024),
+    "heavy_modules_loaded": [name for name in heavy if name in sys.modules],
+}))
+"""
+
+# Function to measure one cold start
+def measure_cold_start():
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        capture_output=True,
+        text=True
+    )
+    if result.returncode != 0:
+        print(result.stderr, file=sys.stderr)
+        sys.exit(f"Importing app failed with exit code {result.returncode}, see the error above.")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the cold-start import cost of app.py.")
+    parser.add_argument("--runs", type=int, default=5, help="number of fresh interpreters to time")
+    parser.add_argument("--budget-seconds", type=float, help="fail if the median import time exceeds this")
+    parser.add_argument("--budget-mb", type=float, help="fail if the median peak RSS exceeds this")
+    parser.add_argument("--output", help="append the result as one JSON line to this file")
+    args = parser.parse_args()
+
+    samples = [measure_cold_start() for _ in range(args.runs)]
+    report = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "runs": args.runs,
+        "median_seconds": round(statistics.median(sample["seconds"] for sample in samples), 4),
+        "median_max_rss_mb": round(statistics.median(sample["max_rss_mb"] for sample in samples), 1),
+        "heavy_modules_loaded": samples[-1]["heavy_modules_loaded"],
+    }
+    print(json.dumps(report, indent=2))
+
+    if args.output:
+        with open(args.output, "a") as f:
+            f.write(json.dumps(report) + "\n")
+
+    over_budget = []
+    if args.budget_seconds is not None and report["median_seconds"] > args.budget_seconds:
+        over_budget.append(f"import took {report['median_seconds']}s, budget is {args.budget_seconds}s")
+    if args.budget_mb is not None and report["median_max_rss_mb"] > args.budget_mb:
+        over_budget.append(f"peak RSS was {report['median_max_rss_mb']} MB, budget is {args.budget_mb} MB")
+    if over_budget:
+        print("Cold-start budget exceeded: " + "; ".join(over_budget), file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
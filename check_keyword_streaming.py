@@ -0,0 +1,64 @@
+import argparse
+import os
+import random
+import sys
+import tempfile
+
+# Checks that the streaming Keyword Planner path picks exactly the same top keywords as the in-memory
+# path, on synthetic exports with tied scores, heavy near-duplication and several chunk and window sizes.
+# app reads st.secrets at import time, so .streamlit/secrets.toml must exist where this runs.
+
+BASE_TERMS = ["running shoes", "trail shoes", "hiking boots", "rain jacket", "yoga mat", "water bottle",
+              "camping tent", "sleeping bag", "bike helmet", "gym bag", "ski goggles", "swim cap"]
+VARIANTS = ["", "s", " uk", " sale", " cheap", " best", " for women", " for men", " near me", " 2024"]
+
+# Function to write a synthetic export in the Keyword Planner layout: UTF-16, tab separated, two title lines
+def write_export(path, rng, rows, base_count):
+    bases = [f"{rng.choice(BASE_TERMS)} {rng.choice(['', 'red', 'blue', 'kids', 'pro'])} {i}".replace("  ", " ")
+             for i in range(base_count)]
+    lines = ["Keyword Stats", "All locations",
+             "Keyword\tCurrency\tAvg. monthly searches\tCompetition (indexed value)\tTop of page bid (low range)\tTop of page bid (high range)"]
+    for _ in range(rows):
+        # Few distinct metric values, so many rows tie on score
+        searches = rng.choice(["10", "50", "500", "5000", "", "1,000"])
+        competition = rng.choice(["0", "20", "50", "80", "95", ""])
+        bid = rng.choice(["1.5", "2", "3.25", "10", ""])
+        lines.append(f"{rng.choice(bases)}{rng.choice(VARIANTS)}\tUSD\t{searches}\t{competition}\t0.5\t{bid}")
+    with open(path, "w", encoding="utf-16") as f:
+        f.write("\n".join(lines) + "\n")
+
+def main():
+    parser = argparse.ArgumentParser(description="Check that streamed and in-memory keyword selection agree.")
+    parser.add_argument("--cases", type=int, default=12, help="number of synthetic exports to check")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first case")
+    args = parser.parse_args()
+
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    sys.path.insert(0, os.getcwd())
+    import pandas as pd
+    import app
+
+    failures = 0
+    with tempfile.TemporaryDirectory() as folder:
+        for case in range(args.seed, args.seed + args.cases):
+            rng = random.Random(case)
+            path = os.path.join(folder, f"export_{case}.csv")
+            rows = rng.randint(200, 5000)
+            write_export(path, rng, rows, base_count=rng.choice([5, 40, 400, 3000]))
+            chunk_rows = rng.choice([97, 500, 100000])
+            window_rows = rng.choice([50, 300, app.KEYWORD_WINDOW_ROWS])
+
+            expected = app.process_google_data(path, "check")
+            streamed = app.process_google_data_streaming(path, chunk_rows=chunk_rows, window_rows=window_rows)
+            try:
+                pd.testing.assert_frame_equal(streamed, expected)
+                print(f"case {case}: {rows} rows, chunks of {chunk_rows}, windows of {window_rows}: {len(expected)} keywords match")
+            except AssertionError as error:
+                failures += 1
+                print(f"case {case}: {rows} rows, chunks of {chunk_rows}, windows of {window_rows}: MISMATCH\n{error}", file=sys.stderr)
+
+    if failures:
+        sys.exit(f"{failures} of {args.cases} cases differ between the streaming and in-memory paths.")
+
+if __name__ == "__main__":
+    main()